@@ -3,20 +3,30 @@ MOM Bot - Streamlit Web Interface
 Main application file
 """
 import streamlit as st
+import pandas as pd
 
 import os
-import json
+import sys
+import gzip
+import logging
+import orjson
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import time
 from pathlib import Path
 
-from dotenv import load_dotenv  # 👈 ADD THIS
-load_dotenv()  # 👈 ENSURE .env IS LOADED HERE
+import env  # loads .env before our modules read their settings
+
+# Transcription progress goes through logging; show it on the server console
+# as the old prints did (a no-op on reruns once the handler exists)
+logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
 
 # Import our existing modules
-from transcribe_audio import transcribe_audio
+from transcribe_audio import transcribe_audio, count_words
 from generate_mom import generate_mom
 from email_service import send_mom_email
+from upload_store import save_uploaded_file, UPLOAD_DIR
 
 # Page configuration
 st.set_page_config(
@@ -27,7 +37,7 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
+_CSS = """
 <style>
     .main-header {
         font-size: 3rem;
@@ -67,7 +77,7 @@ st.markdown("""
         margin: 1rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
 
 # Initialize session state
 if 'processed_meetings' not in st.session_state:
@@ -79,26 +89,48 @@ if 'current_mom' not in st.session_state:
 if 'current_transcript' not in st.session_state:
     st.session_state.current_transcript = None
 
+if 'processing_jobs' not in st.session_state:
+    st.session_state.processing_jobs = []
+
+@st.cache_resource
+def get_executor():
+    """Worker pool for the Whisper + GPT pipeline, shared across reruns and sessions"""
+    # The pipeline is network-bound against OpenAI, so threads are enough
+    return ThreadPoolExecutor(max_workers=int(os.getenv("MOM_WORKERS", "4")))
+
+EXECUTOR = get_executor()
+
 # Create directories
-Path("uploads").mkdir(exist_ok=True)
+Path(UPLOAD_DIR).mkdir(exist_ok=True)
 Path("transcripts").mkdir(exist_ok=True)
 Path("moms").mkdir(exist_ok=True)
 
+PRIORITY_EMOJI = {
+    'high': '🔴',
+    'medium': '🟡',
+    'low': '🟢'
+}
+
 def format_duration(seconds):
     """Format duration in seconds to readable format"""
     minutes = int(seconds // 60)
     secs = int(seconds % 60)
     return f"{minutes}m {secs}s"
 
-def save_uploaded_file(uploaded_file):
-    """Save uploaded file to disk"""
-    file_path = os.path.join("uploads", uploaded_file.name)
-    with open(file_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
-    return file_path
+def report_progress(progress, message):
+    """Push a progress update for the UI thread (Streamlit widgets can't be touched from workers)"""
+    if progress is not None:
+        progress.put(message)
+
+def process_audio_file(file_path, meeting_title, progress=None, partial=None):
+    """
+    Process audio file through complete pipeline
 
-def process_audio_file(file_path, meeting_title):
-    """Process audio file through complete pipeline"""
+    Runs on a worker thread, so it must not call any Streamlit APIs.
+    Step labels are reported as messages on the `progress` queue,
+    and transcript parts as (part_index, text) tuples on the `partial` queue
+    as soon as Whisper returns them.
+    """
     
     results = {
         'success': False,
@@ -106,18 +138,16 @@ def process_audio_file(file_path, meeting_title):
         'mom': None,
         'transcript_file': None,
         'mom_file': None,
+        'meeting': None,
         'error': None
     }
     
     try:
         # Step 1: Transcription
-        st.info("🎙️ Step 1/3: Transcribing audio...")
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        status_text.text("Sending audio to Whisper API...")
+        report_progress(progress, "🎙️ Step 1/3: Transcribing audio with Whisper...")
         try:
-            transcript_result = transcribe_audio(file_path)
+            on_part = (lambda index, part: partial.put((index, part['text']))) if partial is not None else None
+            transcript_result = transcribe_audio(file_path, on_part=on_part, save=False)
             
             if not transcript_result:
                 results['error'] = "Transcription failed after 3 attempts. OpenAI API might be temporarily down. Please try again in a few minutes."
@@ -126,63 +156,155 @@ def process_audio_file(file_path, meeting_title):
             results['error'] = f"Transcription error: {str(e)}"
             return results
         
-        progress_bar.progress(33)
-        status_text.text("✅ Transcription complete!")
-        
         
         # Save transcript
-        transcript_file = file_path.replace('uploads/', 'transcripts/').replace('.mp3', '_transcript.json').replace('.webm', '_transcript.json').replace('.wav', '_transcript.json').replace('.m4a', '_transcript.json')
+        stem = Path(file_path).stem
+        transcript_file = str(Path("transcripts") / f"{stem}_transcript.json.gz")
         
         
-        with open(transcript_file, "w") as f:
-            json.dump(transcript_result, f, indent=2)  # ✅ write the actual transcription
+        # Long transcripts are large, repetitive JSON - store them gzip-compressed
+        with gzip.open(transcript_file, "wb", compresslevel=3) as f:
+            f.write(orjson.dumps(transcript_result))  # ✅ write the actual transcription
         
         results['transcript'] = transcript_result
         results['transcript_file'] = transcript_file
         
         # Step 2: MOM Generation
-        st.info("🤖 Step 2/3: Generating Minutes of Meeting...")
-        status_text.text("Analyzing transcript with GPT-4...")
+        report_progress(progress, "🤖 Step 2/3: Generating Minutes of Meeting with GPT-4...")
         
-        mom_data = generate_mom(transcript_file)
+        mom_data = generate_mom(transcript_result)
         
         if not mom_data:
             results['error'] = "MOM generation failed"
             return results
         
-        progress_bar.progress(66)
-        status_text.text("✅ MOM generated successfully!")
-        
-        # Save MOM
-        mom_file = transcript_file.replace('transcripts/', 'moms/').replace('_transcript.json', '_mom.json')
-        with open(mom_file, 'w') as f:
-            json.dump(mom_data, f, indent=2)
+        # Step 3: Save MOM
+        report_progress(progress, "💾 Step 3/3: Saving Minutes of Meeting...")
+        mom_file = str(Path("moms") / f"{stem}_mom.json")
+        with open(mom_file, 'wb') as f:
+            f.write(orjson.dumps(mom_data, option=orjson.OPT_INDENT_2))
         
         results['mom'] = mom_data
         results['mom_file'] = mom_file
         
-        progress_bar.progress(100)
-        status_text.text("✅ Processing complete!")
-        
         results['success'] = True
-        
-        # Save to session state
-        st.session_state.processed_meetings.append({
+        results['meeting'] = {
             'title': meeting_title,
             'date': datetime.now().isoformat(),
             'transcript_file': transcript_file,
             'mom_file': mom_file,
             'duration': transcript_result.get('duration', 0)
-        })
-        
-        st.session_state.current_mom = mom_data
-        st.session_state.current_transcript = transcript_result
+        }
         
     except Exception as e:
         results['error'] = str(e)
     
     return results
 
+def submit_processing(file_path, meeting_title):
+    """Queue a file on the worker pool; several files run concurrently"""
+    progress = queue.Queue()
+    partial = queue.Queue()
+    st.session_state.processing_jobs.append({
+        'name': Path(file_path).name,
+        'future': EXECUTOR.submit(process_audio_file, file_path, meeting_title, progress, partial),
+        'progress': progress,
+        'partial': partial,
+        'parts': {}
+    })
+
+def wait_for_processing():
+    """Poll the background jobs, mirroring their progress into the UI until all finish"""
+    jobs = st.session_state.processing_jobs
+    for job in jobs:
+        # One status block per file groups all its updates
+        job['status'] = st.status(f"📁 {job['name']}: Processing meeting...", expanded=True)
+        with job['status']:
+            job['transcript_preview'] = st.empty()
+    
+    def show_preview(job):
+        preview = " ".join(job['parts'][i] for i in sorted(job['parts']))
+        job['transcript_preview'].caption(f"📝 {preview[-1000:]}")
+    
+    for job in jobs:
+        if job['parts']:
+            show_preview(job)
+    
+    def drain(job):
+        while True:
+            try:
+                message = job['progress'].get_nowait()
+            except queue.Empty:
+                break
+            job['status'].update(label=f"📁 {job['name']}: {message}")
+        
+        # Show transcript parts as they arrive (they may finish out of order)
+        updated = False
+        while True:
+            try:
+                index, text = job['partial'].get_nowait()
+            except queue.Empty:
+                break
+            job['parts'][index] = text
+            updated = True
+        if updated:
+            show_preview(job)
+    
+    while not all(job['future'].done() for job in jobs):
+        for job in jobs:
+            drain(job)
+        time.sleep(0.5)
+    
+    all_results = []
+    for job in jobs:
+        drain(job)
+        results = job['future'].result()
+        results['name'] = job['name']
+        all_results.append(results)
+        
+        if results['success']:
+            job['status'].update(label=f"📁 {job['name']}: ✅ Processing complete!", state="complete", expanded=False)
+            
+            # Save to session state (only the script thread may do this)
+            st.session_state.processed_meetings.append(results['meeting'])
+            st.session_state.current_mom = results['mom']
+            st.session_state.current_transcript = results['transcript']
+        else:
+            job['status'].update(label=f"📁 {job['name']}: ❌ Processing failed", state="error")
+    
+    st.session_state.processing_jobs = []
+    return all_results
+
+@st.cache_data
+def numbered_list(items):
+    """Format items as one markdown numbered list (a single widget instead of one per item)"""
+    return "\n".join(f"{i}. {item}" for i, item in enumerate(items, 1))
+
+@st.cache_data
+def decisions_table(decisions):
+    """Format decisions as a table (cached, so reruns skip the formatting)"""
+    return pd.DataFrame(
+        [{
+            'Decision': decision.get('decision', 'N/A'),
+            'Decided by': decision.get('made_by', 'Team'),
+            'Time': decision.get('timestamp', '')
+        } for decision in decisions],
+        index=range(1, len(decisions) + 1)
+    )
+
+@st.cache_data
+def action_items_table(action_items):
+    """Format action items as a table (cached, so reruns skip the formatting)"""
+    return pd.DataFrame(
+        [{
+            'Priority': f"{PRIORITY_EMOJI.get(item.get('priority', 'medium'), '⚪')} {item.get('priority', 'medium').upper()}",
+            'Task': item.get('task', 'N/A'),
+            'Owner': item.get('owner', 'Unassigned'),
+            'Deadline': item.get('deadline', 'Not specified')
+        } for item in action_items],
+        index=range(1, len(action_items) + 1)
+    )
+
 def display_mom(mom_data):
     """Display MOM in a formatted way"""
     
@@ -197,41 +319,31 @@ def display_mom(mom_data):
     # Key Points
     if mom_data.get('key_points'):
         st.markdown("### 🔑 Key Discussion Points")
-        for i, point in enumerate(mom_data['key_points'], 1):
-            st.markdown(f"{i}. {point}")
+        st.markdown(numbered_list(mom_data['key_points']))
     
-    # Decisions
+    # Decisions (one table instead of an expander per item)
     if mom_data.get('decisions'):
         st.markdown("### ✅ Decisions Made")
-        for i, decision in enumerate(mom_data['decisions'], 1):
-            with st.expander(f"Decision {i}: {decision.get('decision', 'N/A')[:50]}..."):
-                st.write(f"**Decision:** {decision.get('decision', 'N/A')}")
-                st.write(f"**Decided by:** {decision.get('made_by', 'Team')}")
-                if decision.get('timestamp'):
-                    st.write(f"**Time:** {decision.get('timestamp')}")
+        decisions = decisions_table(mom_data['decisions'])
+        st.dataframe(decisions, use_container_width=True)
     
     # Action Items
     if mom_data.get('action_items'):
         st.markdown("### 📌 Action Items")
-        for i, item in enumerate(mom_data['action_items'], 1):
-            priority = item.get('priority', 'medium')
-            priority_color = {
-                'high': '🔴',
-                'medium': '🟡',
-                'low': '🟢'
-            }.get(priority, '⚪')
-            
-            with st.expander(f"{priority_color} Action {i}: {item.get('task', 'N/A')[:50]}..."):
-                st.write(f"**Task:** {item.get('task', 'N/A')}")
-                st.write(f"**Owner:** {item.get('owner', 'Unassigned')}")
-                st.write(f"**Deadline:** {item.get('deadline', 'Not specified')}")
-                st.write(f"**Priority:** {priority.upper()}")
+        action_items = action_items_table(mom_data['action_items'])
+        st.dataframe(
+            action_items,
+            use_container_width=True,
+            column_config={
+                'Priority': st.column_config.TextColumn('Priority', width='small'),
+                'Task': st.column_config.TextColumn('Task', width='large')
+            }
+        )
     
     # Questions
     if mom_data.get('questions'):
         st.markdown("### ❓ Open Questions")
-        for i, question in enumerate(mom_data['questions'], 1):
-            st.markdown(f"{i}. {question}")
+        st.markdown(numbered_list(mom_data['questions']))
     
     # Next Steps
     if mom_data.get('next_steps'):
@@ -245,9 +357,15 @@ def display_mom(mom_data):
         for i, attendee in enumerate(mom_data['attendees']):
             cols[i % 5].markdown(f"👤 {attendee}")
 
+def inject_css():
+    """Emit the custom CSS (must run on every rerun - Streamlit drops elements not re-emitted)"""
+    st.markdown(_CSS, unsafe_allow_html=True)
+
 def main():
     """Main application"""
     
+    inject_css()
+    
     # Header
     st.markdown('<h1 class="main-header">📋 MOM Bot</h1>', unsafe_allow_html=True)
     st.markdown('<p class="sub-header">AI-Powered Meeting Minutes Generator</p>', unsafe_allow_html=True)
@@ -293,10 +411,11 @@ def main():
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            uploaded_file = st.file_uploader(
-                "Choose audio or video file",
+            uploaded_files = st.file_uploader(
+                "Choose audio or video file(s)",
                 type=['mp3', 'wav', 'm4a', 'webm', 'mp4', 'avi', 'mov'],
-                help="Upload your meeting recording (MP3, MP4, WAV, M4A, WebM, AVI, MOV)"
+                accept_multiple_files=True,
+                help="Upload one or more meeting recordings (MP3, MP4, WAV, M4A, WebM, AVI, MOV)"
             )
         
         with col2:
@@ -306,25 +425,40 @@ def main():
                 help="Give your meeting a name"
             )
         
-        if uploaded_file and meeting_title:
-            st.success(f"✅ File uploaded: {uploaded_file.name} ({uploaded_file.size / 1024 / 1024:.2f} MB)")
+        all_results = []
+        
+        if st.session_state.processing_jobs:
+            # A rerun interrupted polling - pick the running jobs back up
+            with st.spinner("Processing..."):
+                all_results = wait_for_processing()
+        
+        elif uploaded_files and meeting_title:
+            for uploaded_file in uploaded_files:
+                st.success(f"✅ File uploaded: {uploaded_file.name} ({uploaded_file.size / 1024 / 1024:.2f} MB)")
             
             if st.button("🚀 Process Meeting", type="primary", use_container_width=True):
                 with st.spinner("Processing..."):
-                    # Save file
-                    file_path = save_uploaded_file(uploaded_file)
-                    
-                    # Process
-                    results = process_audio_file(file_path, meeting_title)
+                    for uploaded_file in uploaded_files:
+                        # Save file
+                        file_path = save_uploaded_file(uploaded_file)
+                        
+                        # Process in the background; multiple files are transcribed concurrently
+                        title = meeting_title if len(uploaded_files) == 1 else f"{meeting_title} ({uploaded_file.name})"
+                        submit_processing(file_path, title)
                     
-                    if results['success']:
-                        st.balloons()
-                        st.success("🎉 Processing complete! Check the 'View MOM' tab.")
-                    else:
-                        st.error(f"❌ Error: {results['error']}")
+                    all_results = wait_for_processing()
         
-        elif uploaded_file and not meeting_title:
+        elif uploaded_files and not meeting_title:
             st.warning("⚠️ Please enter a meeting title")
+        
+        for results in all_results:
+            if results['success']:
+                st.success(f"🎉 {results['name']}: Processing complete! Check the 'View MOM' tab.")
+            else:
+                st.error(f"❌ {results['name']}: Error: {results['error']}")
+        
+        if any(results['success'] for results in all_results):
+            st.balloons()
     
     # Tab 2: View MOM
     with tab2:
@@ -337,7 +471,7 @@ def main():
             with col1:
                 st.metric("Duration", format_duration(transcript_data.get('duration', 0)))
             with col2:
-                st.metric("Words", f"{len(transcript_data.get('text', '').split()):,}")
+                st.metric("Words", f"{count_words(transcript_data.get('text', '')):,}")
             with col3:
                 st.metric("Decisions", len(mom_data.get('decisions', [])))
             with col4:
@@ -350,7 +484,7 @@ def main():
             st.markdown("---")
             col1, col2 = st.columns(2)
             with col1:
-                mom_json = json.dumps(mom_data, indent=2)
+                mom_json = orjson.dumps(mom_data, option=orjson.OPT_INDENT_2)
                 st.download_button(
                     label="📥 Download MOM (JSON)",
                     data=mom_json,
@@ -407,7 +541,9 @@ def main():
                             )
                             
                             if result['status'] == 'success':
-                                st.success(f"✅ Email sent successfully to {len(recipient_list)} recipient(s)!")
+                                st.success(f"✅ Email sent successfully to {len(result['recipients'])} recipient(s)!")
+                                if result['invalid']:
+                                    st.warning(f"⚠️ Skipped invalid address(es): {', '.join(result['invalid'])}")
                                 st.balloons()
                             else:
                                 st.error(f"❌ Failed to send email: {result['message']}")
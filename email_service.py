@@ -3,45 +3,29 @@ Email service to send MOM to participants using SendGrid
 """
 
 import os
+import re
+import functools
 from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Email, To, Content
-from dotenv import load_dotenv
-import json
+from sendgrid.helpers.mail import Mail, Email, To, Content, Personalization
+import env  # loads .env
+import orjson
 from datetime import datetime
-
-load_dotenv()
+from html import escape
 
 SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
 SENDGRID_FROM_EMAIL = os.getenv("SENDGRID_FROM_EMAIL")
 SENDGRID_FROM_NAME = os.getenv("SENDGRID_FROM_NAME", "MOM Bot")
+SENDGRID_TEMPLATE_ID = os.getenv("SENDGRID_TEMPLATE_ID")  # Optional dynamic template
+MOM_DRY_RUN = os.getenv("MOM_DRY_RUN", "").lower() in ("1", "true", "yes")  # Render only, never call SendGrid
 
-def create_mom_html(mom_data):
-    """
-    Create beautiful HTML email from MOM data
-    
-    Args:
-        mom_data: Dictionary containing MOM information
-    
-    Returns:
-        str: HTML formatted email
-    """
-    
-    # Extract data
-    summary = mom_data.get('summary', 'No summary available')
-    key_points = mom_data.get('key_points', [])
-    decisions = mom_data.get('decisions', [])
-    action_items = mom_data.get('action_items', [])
-    questions = mom_data.get('questions', [])
-    next_steps = mom_data.get('next_steps', 'No next steps specified')
-    attendees = mom_data.get('attendees', [])
-    metadata = mom_data.get('metadata', {})
-    
-    # Get meeting date
-    generated_at = metadata.get('generated_at', datetime.now().isoformat())
-    meeting_date = generated_at.split('T')[0]
-    
-    # Build HTML
-    html = f"""
+# Basic shape check so obviously bad addresses never reach SendGrid
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Shared SendGrid client, built once instead of on every send
+_SG_CLIENT = SendGridAPIClient(SENDGRID_API_KEY) if SENDGRID_API_KEY else None
+
+# Static document skeleton, built once at import; only the date is substituted per render
+_HEADER_TMPL = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -160,105 +144,146 @@ def create_mom_html(mom_data):
                 <div class="meta">Generated on {meeting_date}</div>
             </div>
     """
+
+_FOOTER_HTML = """
+            <div class="footer">
+                <p>This MOM was automatically generated by MOM Bot 🤖</p>
+                <p>Powered by AI • Generated with GPT-4 & Whisper</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+def _esc(value):
+    """HTML-escape a MOM field (model output may contain <, & or quotes)"""
+    return escape(str(value), quote=True)
+
+def create_mom_html(mom_data):
+    """
+    Create beautiful HTML email from MOM data
+    
+    Rendering is memoized on the MOM contents, so re-sending or previewing
+    an unchanged MOM skips the rebuild.
+    
+    Args:
+        mom_data: Dictionary containing MOM information
+    
+    Returns:
+        str: HTML formatted email
+    """
+    # Resolve the date outside the cache, so a MOM without one shows today's
+    # date rather than whenever it was first rendered
+    generated_at = mom_data.get('metadata', {}).get('generated_at') or datetime.now().isoformat()
+    meeting_date = generated_at.split('T')[0]
+    
+    return _render_mom_html(orjson.dumps(mom_data, option=orjson.OPT_SORT_KEYS), meeting_date)
+
+@functools.lru_cache(maxsize=32)
+def _render_mom_html(mom_json, meeting_date):
+    """Render the MOM HTML from its canonical JSON and date (hashable cache key)"""
+    mom_data = orjson.loads(mom_json)
+    
+    # Extract data
+    summary = mom_data.get('summary', 'No summary available')
+    key_points = mom_data.get('key_points', [])
+    decisions = mom_data.get('decisions', [])
+    action_items = mom_data.get('action_items', [])
+    questions = mom_data.get('questions', [])
+    next_steps = mom_data.get('next_steps', 'No next steps specified')
+    attendees = mom_data.get('attendees', [])
+    
+    # Build HTML (collect parts and join once instead of repeated concatenation)
+    parts = [_HEADER_TMPL.format(meeting_date=_esc(meeting_date))]
     
     # Attendees
     if attendees:
-        html += """
+        parts.append("""
             <h2>👥 Attendees</h2>
             <div class="attendees">
-        """
-        for attendee in attendees:
-            html += f'<div class="attendee">{attendee}</div>'
-        html += "</div>"
+        """)
+        parts.extend(f'<div class="attendee">{a}</div>' for a in map(_esc, attendees))
+        parts.append("</div>")
     
     # Summary
-    html += f"""
+    parts.append(f"""
             <h2>📝 Summary</h2>
             <div class="summary">
-                {summary}
+                {_esc(summary)}
             </div>
-    """
+    """)
     
     # Key Points
     if key_points:
-        html += """
+        parts.append("""
             <h2>🔑 Key Discussion Points</h2>
             <ul>
-        """
-        for point in key_points:
-            html += f"<li>{point}</li>"
-        html += "</ul>"
+        """)
+        parts.extend(f"<li>{p}</li>" for p in map(_esc, key_points))
+        parts.append("</ul>")
     
     # Decisions
     if decisions:
-        html += """
+        parts.append("""
             <h2>✅ Decisions Made</h2>
-        """
+        """)
         for i, decision in enumerate(decisions, 1):
-            made_by = decision.get('made_by', 'Team')
-            timestamp = decision.get('timestamp', '')
-            html += f"""
+            made_by = _esc(decision.get('made_by', 'Team'))
+            timestamp = _esc(decision.get('timestamp', ''))
+            parts.append(f"""
             <div class="item decision">
-                <div class="item-header">{i}. {decision.get('decision', 'N/A')}</div>
+                <div class="item-header">{i}. {_esc(decision.get('decision', 'N/A'))}</div>
                 <div class="item-detail">👤 Decided by: {made_by}</div>
-            """
+            """)
             if timestamp:
-                html += f'<div class="item-detail">🕐 Time: {timestamp}</div>'
-            html += "</div>"
+                parts.append(f'<div class="item-detail">🕐 Time: {timestamp}</div>')
+            parts.append("</div>")
     
     # Action Items
     if action_items:
-        html += """
+        parts.append("""
             <h2>📌 Action Items</h2>
-        """
+        """)
         for i, item in enumerate(action_items, 1):
-            owner = item.get('owner', 'Unassigned')
-            deadline = item.get('deadline', 'Not specified')
-            priority = item.get('priority', 'medium')
+            owner = _esc(item.get('owner', 'Unassigned'))
+            deadline = _esc(item.get('deadline', 'Not specified'))
+            priority = _esc(item.get('priority', 'medium'))
             priority_class = f"priority-{priority}"
             
-            html += f"""
+            parts.append(f"""
             <div class="item action">
-                <div class="item-header">{i}. {item.get('task', 'N/A')}</div>
+                <div class="item-header">{i}. {_esc(item.get('task', 'N/A'))}</div>
                 <div class="item-detail">👤 Owner: {owner}</div>
                 <div class="item-detail">📅 Deadline: {deadline}</div>
                 <div class="item-detail">⚡ Priority: <span class="{priority_class}">{priority.upper()}</span></div>
             </div>
-            """
+            """)
     
     # Questions
     if questions:
-        html += """
+        parts.append("""
             <h2>❓ Open Questions</h2>
-        """
+        """)
         for i, question in enumerate(questions, 1):
-            html += f"""
+            parts.append(f"""
             <div class="item question">
-                <div class="item-header">{i}. {question}</div>
+                <div class="item-header">{i}. {_esc(question)}</div>
             </div>
-            """
+            """)
     
     # Next Steps
     if next_steps and next_steps != "No next steps specified":
-        html += f"""
+        parts.append(f"""
             <h2>🚀 Next Steps</h2>
             <div class="summary">
-                {next_steps}
+                {_esc(next_steps)}
             </div>
-        """
+        """)
     
     # Footer
-    html += """
-            <div class="footer">
-                <p>This MOM was automatically generated by MOM Bot 🤖</p>
-                <p>Powered by AI • Generated with GPT-4 & Whisper</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    parts.append(_FOOTER_HTML)
     
-    return html
+    return "".join(parts)
 
 def send_mom_email(to_emails, mom_data, meeting_title="Team Meeting"):
     """
@@ -273,6 +298,36 @@ def send_mom_email(to_emails, mom_data, meeting_title="Team Meeting"):
         dict: Status of email sending
     """
     
+    # Convert single email to list (None - e.g. an unset default - means no recipients)
+    to_emails = [to_emails] if isinstance(to_emails, str) else list(to_emails or [])
+    
+    # Validate recipients up front
+    valid, invalid = [], []
+    for email in to_emails:
+        email = email.strip()
+        (valid if _EMAIL_RE.match(email) else invalid).append(email)
+    
+    if invalid:
+        print(f"⚠️  Skipping invalid email address(es): {', '.join(invalid)}")
+    
+    if not valid:
+        print("❌ Error: No valid recipient email addresses")
+        return {"status": "error", "message": "No valid recipient email addresses", "invalid": invalid}
+    
+    to_emails = valid
+    
+    # Dry run: render the HTML without any network I/O (CI / profiling)
+    if MOM_DRY_RUN:
+        html_content = create_mom_html(mom_data)
+        print(f"🧪 Dry run - email not sent ({len(html_content):,} characters of HTML)")
+        return {
+            "status": "success",
+            "html": html_content,
+            "recipients": to_emails,
+            "invalid": invalid,
+            "message": "Dry run - email not sent"
+        }
+    
     # Validate API key
     if not SENDGRID_API_KEY:
         print("❌ Error: SENDGRID_API_KEY not found in .env file")
@@ -282,19 +337,6 @@ def send_mom_email(to_emails, mom_data, meeting_title="Team Meeting"):
         print("❌ Error: SENDGRID_FROM_EMAIL not found in .env file")
         return {"status": "error", "message": "From email not configured"}
     
-    # Convert single email to list
-    if isinstance(to_emails, str):
-        to_emails = [to_emails]
-    
-    # Create HTML content
-    html_content = create_mom_html(mom_data)
-    
-    # Create plain text version (fallback)
-    summary = mom_data.get('summary', 'No summary available')
-    plain_text = f"Minutes of Meeting: {meeting_title}\n\n"
-    plain_text += f"Summary:\n{summary}\n\n"
-    plain_text += "Please view this email in HTML format for the full formatted MOM.\n"
-    
     # Email subject
     meeting_date = datetime.now().strftime("%Y-%m-%d")
     subject = f"[MOM] {meeting_title} - {meeting_date}"
@@ -305,20 +347,48 @@ def send_mom_email(to_emails, mom_data, meeting_title="Team Meeting"):
     print(f"   Subject: {subject}")
     
     try:
-        # Create SendGrid client
-        sg = SendGridAPIClient(SENDGRID_API_KEY)
-        
         # Create message
-        message = Mail(
-            from_email=Email(SENDGRID_FROM_EMAIL, SENDGRID_FROM_NAME),
-            to_emails=[To(email) for email in to_emails],
-            subject=subject,
-            plain_text_content=Content("text/plain", plain_text),
-            html_content=Content("text/html", html_content)
-        )
+        if SENDGRID_TEMPLATE_ID:
+            # Dynamic template: SendGrid renders the MOM, we only send the data
+            message = Mail(
+                from_email=Email(SENDGRID_FROM_EMAIL, SENDGRID_FROM_NAME),
+                subject=subject
+            )
+            message.template_id = SENDGRID_TEMPLATE_ID
+            template_data = {
+                **mom_data,
+                'meeting_title': meeting_title,
+                'subject': subject
+            }
+        else:
+            # Create HTML content
+            html_content = create_mom_html(mom_data)
+            
+            # Create plain text version (fallback)
+            summary = mom_data.get('summary', 'No summary available')
+            plain_text = f"Minutes of Meeting: {meeting_title}\n\n"
+            plain_text += f"Summary:\n{summary}\n\n"
+            plain_text += "Please view this email in HTML format for the full formatted MOM.\n"
+            
+            message = Mail(
+                from_email=Email(SENDGRID_FROM_EMAIL, SENDGRID_FROM_NAME),
+                subject=subject,
+                plain_text_content=Content("text/plain", plain_text),
+                html_content=Content("text/html", html_content)
+            )
+            template_data = None
+        
+        # One personalization per recipient: SendGrid fans out server-side from
+        # a single request, and recipients don't see each other's addresses
+        for email in to_emails:
+            personalization = Personalization()
+            personalization.add_to(To(email))
+            if template_data:
+                personalization.dynamic_template_data = template_data
+            message.add_personalization(personalization)
         
         # Send email
-        response = sg.send(message)
+        response = _SG_CLIENT.send(message)
         
         print(f"✅ Email sent successfully!")
         print(f"   Status code: {response.status_code}")
@@ -327,6 +397,7 @@ def send_mom_email(to_emails, mom_data, meeting_title="Team Meeting"):
             "status": "success",
             "status_code": response.status_code,
             "recipients": to_emails,
+            "invalid": invalid,
             "message": "Email sent successfully"
         }
         
@@ -349,8 +420,8 @@ if __name__ == "__main__":
         print("Please run generate_mom.py first to create a MOM")
     else:
         # Load MOM data
-        with open(mom_file, 'r') as f:
-            mom_data = json.load(f)
+        with open(mom_file, 'rb') as f:
+            mom_data = orjson.loads(f.read())
         
         # Get recipient email
         print("📧 Email Test")
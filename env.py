@@ -0,0 +1,14 @@
+"""
+Loads .env once per process - import this instead of calling load_dotenv()
+
+Must be imported before any module-level os.getenv() reads. Settings shared
+by several modules are read here once; module-specific ones stay in their
+modules as constants.
+"""
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -3,31 +3,103 @@ Generate Minutes of Meeting (MOM) from transcript using GPT-4
 """
 
 import os
+import gzip
 import json
-from openai import OpenAI
-from dotenv import load_dotenv
+import functools
+import orjson
+import env
 from datetime import datetime
+from pathlib import Path
+import mom_cache
+from mom_schema import MoM, MoMBatch, parsed_dict
 
-load_dotenv()
+@functools.lru_cache(maxsize=1)
+def _get_client():
+    """
+    Shared OpenAI client with a keep-alive HTTP/2 pool
+    
+    Built on the first MOM request rather than at import, so scripts that
+    only need load_transcript/save_mom don't pay for importing openai.
+    """
+    import httpx
+    from openai import OpenAI
+    
+    return OpenAI(
+        api_key=env.OPENAI_API_KEY,
+        http_client=httpx.Client(http2=True, limits=httpx.Limits(max_keepalive_connections=20))
+    )
+
+# Fields to extract for every MOM
+MOM_FIELDS = """1. **summary**: A brief 2-3 sentence overview of what was discussed
+2. **key_points**: Array of main discussion points (3-5 bullet points)
+3. **decisions**: Array of decisions made, each with:
+   - decision: The decision text
+   - made_by: Who made the decision (if mentioned, otherwise "Team")
+   - timestamp: Approximate time in transcript (if possible)
+4. **action_items**: Array of tasks, each with:
+   - task: What needs to be done
+   - owner: Who is responsible (if mentioned, otherwise "Unassigned")
+   - deadline: Deadline if mentioned (otherwise "Not specified")
+   - priority: high/medium/low based on context
+5. **questions**: Array of unresolved questions or concerns raised
+6. **next_steps**: What should happen after this meeting
+7. **attendees**: List of people mentioned in the meeting (if identifiable from transcript)"""
+
+# Sent byte-identical on every call so OpenAI's automatic prompt caching can
+# reuse the prefix - never interpolate per-meeting data here
+SYSTEM_PROMPT = f"""You are a professional meeting assistant that creates clear, structured minutes of meetings. Analyze the meeting transcript provided by the user and generate a structured Minutes of Meeting (MOM).
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+Please extract and format the following information in JSON format:
+
+{MOM_FIELDS}
+
+Return ONLY valid JSON, no additional text."""
+
+# Input budget per batched request - marshaling too many transcripts into one
+# call degrades quality faster than it saves requests
+BATCH_MAX_INPUT_TOKENS = 6000
+
+def load_transcript(transcript_file):
+    """Load a transcript JSON file (optionally gzip-compressed, .json.gz)"""
+    opener = gzip.open if transcript_file.endswith('.gz') else open
+    with opener(transcript_file, 'rb') as f:
+        return orjson.loads(f.read())
 
-def generate_mom(transcript_file):
+def save_mom(mom, transcript_file):
+    """Save a MOM next to its transcript as *_mom.json"""
+    # Work on the file name only, so matching text in directory names is left
+    # alone and a transcript not named *_transcript.json is never overwritten
+    transcript_path = Path(transcript_file)
+    stem = transcript_path.name.removesuffix('.gz').removesuffix('.json').removesuffix('_transcript')
+    output_file = str(transcript_path.with_name(stem + '_mom.json'))
+    with open(output_file, 'w') as f:
+        json.dump(mom, f, indent=2)
+    
+    print(f"💾 Saved MOM to: {output_file}")
+    return output_file
+
+def generate_mom(transcript, force=False):
     """
     Generate structured MOM from transcript
     
     Args:
-        transcript_file: Path to transcript JSON file
+        transcript: Transcript dict as returned by transcribe_audio, or path to
+                    a transcript JSON file (optionally gzip-compressed, .json.gz).
+                    The MOM is saved next to the file only when a path is given.
+        force: Call the model even if an identical request is in the MOM cache
     
     Returns:
         dict: Structured MOM with summary, decisions, action items, etc.
     """
     
-    print(f"📄 Reading transcript: {transcript_file}")
-    
-    # Load transcript
-    with open(transcript_file, 'r') as f:
-        transcript_data = json.load(f)
+    if isinstance(transcript, dict):
+        # Already in memory - skip the write/read round-trip through disk
+        transcript_file = None
+        transcript_data = transcript
+    else:
+        transcript_file = transcript
+        print(f"📄 Reading transcript: {transcript_file}")
+        transcript_data = load_transcript(transcript_file)
     
     transcript_text = transcript_data.get('text', '')
     
@@ -39,65 +111,44 @@ def generate_mom(transcript_file):
     print("🤖 Generating MOM with GPT-4...")
     print("⏳ This may take 10-30 seconds...")
     
-    # Create prompt for GPT-4
-    prompt = f"""You are an expert meeting assistant. Analyze the following meeting transcript and generate a structured Minutes of Meeting (MOM).
-
-TRANSCRIPT:
-{transcript_text}
-
-Please extract and format the following information in JSON format:
-
-1. **summary**: A brief 2-3 sentence overview of what was discussed
-2. **key_points**: Array of main discussion points (3-5 bullet points)
-3. **decisions**: Array of decisions made, each with:
-   - decision: The decision text
-   - made_by: Who made the decision (if mentioned, otherwise "Team")
-   - timestamp: Approximate time in transcript (if possible)
-4. **action_items**: Array of tasks, each with:
-   - task: What needs to be done
-   - owner: Who is responsible (if mentioned, otherwise "Unassigned")
-   - deadline: Deadline if mentioned (otherwise "Not specified")
-   - priority: high/medium/low based on context
-5. **questions**: Array of unresolved questions or concerns raised
-6. **next_steps**: What should happen after this meeting
-7. **attendees**: List of people mentioned in the meeting (if identifiable from transcript)
-
-Return ONLY valid JSON, no additional text.
-"""
+    model = "gpt-4o-mini"  # Using cheaper model for POC (gpt-4o-mini)
+    # Fixed instructions first, transcript last - keeps the prefix cacheable
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"TRANSCRIPT:\n{transcript_text}"}
+    ]
 
     try:
-        # Call GPT-4
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # Using cheaper model for POC (gpt-4o-mini)
-            messages=[
-                {"role": "system", "content": "You are a professional meeting assistant that creates clear, structured minutes of meetings. Always respond with valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,  # Lower temperature for more consistent output
-            response_format={"type": "json_object"}  # Force JSON output
-        )
-        
-        # Parse response
-        mom_json = response.choices[0].message.content
-        mom = json.loads(mom_json)
-        
-        print("✅ MOM generated successfully!")
+        # Reuse the MOM from an identical earlier request, if any
+        cache_key = mom_cache.cache_key(model, messages, MoM)
+        mom = None if force else mom_cache.load(cache_key)
+        
+        if mom is None:
+            # Call GPT-4
+            response = _get_client().beta.chat.completions.parse(
+                model=model,
+                messages=messages,
+                temperature=0.3,  # Lower temperature for more consistent output
+                response_format=MoM  # Strict schema - no malformed or missing fields
+            )
+            
+            mom = parsed_dict(response)
+            mom_cache.store(cache_key, mom)
+            
+            print("✅ MOM generated successfully!")
         
         # Add metadata
         mom['metadata'] = {
             'generated_at': datetime.now().isoformat(),
             'transcript_file': transcript_file,
-            'model_used': 'gpt-4o-mini',
+            'model_used': model,
             'transcript_length': len(transcript_text),
             'duration': transcript_data.get('duration', 'Unknown')
         }
         
         # Save to file
-        output_file = transcript_file.replace('_transcript.json', '_mom.json')
-        with open(output_file, 'w') as f:
-            json.dump(mom, f, indent=2)
-        
-        print(f"💾 Saved MOM to: {output_file}")
+        if transcript_file:
+            save_mom(mom, transcript_file)
         
         # Print summary
         print("\n" + "="*60)
@@ -133,6 +184,103 @@ Return ONLY valid JSON, no additional text.
         print(f"❌ Error generating MOM: {e}")
         return None
 
+def generate_mom_batched(transcript_files):
+    """
+    Generate MOMs for several short transcripts with as few API calls as possible
+    
+    Transcripts are packed into one request until the input budget
+    (BATCH_MAX_INPUT_TOKENS) is reached, and the model returns one MOM per
+    transcript. Useful when the request rate, not token volume, is the limit
+    (e.g. a nightly run over many short standups).
+    
+    Args:
+        transcript_files: List of transcript JSON file paths
+    
+    Returns:
+        dict: transcript file -> MOM (None for transcripts that failed)
+    """
+    
+    moms = {}
+    
+    # Load transcripts and pack them into batches (~4 characters per token)
+    batches = []
+    current, current_tokens = [], 0
+    for transcript_file in transcript_files:
+        transcript_data = load_transcript(transcript_file)
+        transcript_text = transcript_data.get('text', '')
+        
+        if not transcript_text:
+            print(f"❌ Error: Transcript is empty: {transcript_file}")
+            moms[transcript_file] = None
+            continue
+        
+        tokens = len(transcript_text) // 4
+        if current and current_tokens + tokens > BATCH_MAX_INPUT_TOKENS:
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append((transcript_file, transcript_data))
+        current_tokens += tokens
+    
+    if current:
+        batches.append(current)
+    
+    print(f"🤖 Generating {sum(len(b) for b in batches)} MOMs in {len(batches)} request(s)...")
+    
+    model = "gpt-4o-mini"
+    for batch in batches:
+        transcripts = [{"id": i, "transcript": data['text']} for i, (_, data) in enumerate(batch)]
+        
+        prompt = f"""You are an expert meeting assistant. Below is a JSON array of meeting transcripts, each with an "id". Generate a separate structured Minutes of Meeting (MOM) for EACH transcript.
+
+TRANSCRIPTS:
+{json.dumps(transcripts)}
+
+For each transcript, extract the following information:
+
+{MOM_FIELDS}
+
+Return ONLY valid JSON of the form {{"results": [{{"id": <transcript id>, "summary": ..., ...}}, ...]}} with exactly one entry per transcript, no additional text.
+"""
+        
+        try:
+            response = _get_client().beta.chat.completions.parse(
+                model=model,
+                messages=[
+                    {"role": "system", "content": "You are a professional meeting assistant that creates clear, structured minutes of meetings. Always respond with valid JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                response_format=MoMBatch
+            )
+            results = parsed_dict(response)['results']
+        except Exception as e:
+            print(f"❌ Error generating batched MOMs: {e}")
+            results = []
+        
+        by_id = {result.pop('id', None): result for result in results if isinstance(result, dict)}
+        
+        # Dispatch each MOM to its own file
+        for i, (transcript_file, transcript_data) in enumerate(batch):
+            mom = by_id.get(i)
+            
+            if not mom:
+                print(f"❌ No MOM returned for: {transcript_file}")
+                moms[transcript_file] = None
+                continue
+            
+            mom['metadata'] = {
+                'generated_at': datetime.now().isoformat(),
+                'transcript_file': transcript_file,
+                'model_used': model,
+                'transcript_length': len(transcript_data['text']),
+                'duration': transcript_data.get('duration', 'Unknown'),
+                'processing_method': 'batched'
+            }
+            save_mom(mom, transcript_file)
+            moms[transcript_file] = mom
+    
+    return moms
+
 if __name__ == "__main__":
     # Find transcript file
     #transcript_file = "test_meeting_transcript.json"
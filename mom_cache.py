@@ -0,0 +1,58 @@
+"""
+On-disk cache of generated MOMs, keyed by a hash of the exact LLM request
+"""
+
+import os
+import hashlib
+import tempfile
+from pathlib import Path
+
+import orjson
+
+import env  # MOM_CACHE_DIR may come from .env
+
+CACHE_DIR = Path(os.getenv("MOM_CACHE_DIR", os.path.join("moms", ".cache")))
+
+def cache_key(model, messages, response_format=None):
+    """
+    Build a cache key for a chat completion request
+    
+    The model, full messages (prompt template + transcript) and response
+    schema are hashed, so editing the prompt, switching models or changing
+    the MOM shape invalidates old entries.
+    
+    Args:
+        model: Model name
+        messages: Chat messages sent to the model
+        response_format: Pydantic model the response is parsed into, if any
+    
+    Returns:
+        str: SHA256 hex digest
+    """
+    schema = response_format.model_json_schema() if response_format else None
+    payload = orjson.dumps({"model": model, "messages": messages, "schema": schema})
+    return hashlib.sha256(payload).hexdigest()
+
+def load(key):
+    """Return the cached MOM for `key`, or None on a miss"""
+    cache_file = CACHE_DIR / f"{key}.json"
+    
+    if not cache_file.exists():
+        return None
+    
+    with open(cache_file, 'rb') as f:
+        mom = orjson.loads(f.read())
+    
+    print("⚡ Identical transcript found in cache - skipping GPT call")
+    return mom
+
+def store(key, mom):
+    """Save a generated MOM under `key`"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    
+    # Write to a unique temp file and rename, so readers never see a partial
+    # entry and concurrent threads (the app's worker pool) don't share a temp name
+    fd, tmp_file = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    with os.fdopen(fd, 'wb') as f:
+        f.write(orjson.dumps(mom, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_file, CACHE_DIR / f"{key}.json")
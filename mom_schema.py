@@ -0,0 +1,62 @@
+"""
+Structured-output schemas for MOM generation
+
+Passed as response_format to client.beta.chat.completions.parse, which turns
+them into a strict JSON schema - the model can only return these fields,
+with these types.
+"""
+
+from typing import Literal
+
+from pydantic import BaseModel
+
+class Decision(BaseModel):
+    decision: str
+    made_by: str
+    timestamp: str
+
+class ActionItem(BaseModel):
+    task: str
+    owner: str
+    deadline: str
+    priority: Literal["high", "medium", "low"]
+
+class MoM(BaseModel):
+    """Minutes of a single meeting (fields as described in MOM_FIELDS)"""
+    summary: str
+    key_points: list[str]
+    decisions: list[Decision]
+    action_items: list[ActionItem]
+    questions: list[str]
+    next_steps: str
+    attendees: list[str]
+
+class LongMeetingMoM(MoM):
+    """MOM for long meetings, which also lists the topics covered"""
+    topics_discussed: list[str]
+
+class BatchedMoM(MoM):
+    """One MOM in a multi-transcript response, tagged with its transcript id"""
+    id: int
+
+class MoMBatch(BaseModel):
+    results: list[BatchedMoM]
+
+class ChunkExtract(BaseModel):
+    """Key information pulled from one segment of a long transcript"""
+    key_points: list[str]
+    decisions: list[Decision]
+    action_items: list[ActionItem]
+    questions: list[str]
+
+def parsed_dict(response):
+    """
+    Pull the validated result out of a parse() response as a plain dict
+    
+    Raises:
+        ValueError: If the model refused instead of answering
+    """
+    message = response.choices[0].message
+    if message.parsed is None:
+        raise ValueError(f"Model refused the request: {message.refusal}")
+    return message.parsed.model_dump()
@@ -5,43 +5,182 @@ Enhanced processor for long meetings with better error handling
 import os
 import sys
 import json
-from openai import OpenAI
-from dotenv import load_dotenv
-from transcribe_audio import transcribe_audio
+import time
+import asyncio
+import argparse
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import env
+from pathlib import Path
+from transcribe_audio import transcribe_audio, transcript_path_for, load_saved_transcript, audio_fingerprint, count_words
 from email_service import send_mom_email
+# One client (and HTTP/2 pool) per process, shared with the single-MOM path
+from generate_mom import load_transcript, _get_client
+import mom_cache
+from mom_schema import LongMeetingMoM, ChunkExtract, parsed_dict
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Maximum chunk requests in flight at once
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
 
-def chunk_transcript(transcript_text, max_words=3000):
+# gpt-4o-mini takes 128k input tokens; leave headroom for the prompt and output.
+# Only transcripts above this (many hours of audio) fall back to chunking.
+MAX_SINGLE_CALL_TOKENS = 110_000
+
+# Tokens per chunk when a transcript has to be split
+CHUNK_MAX_TOKENS = 8000
+
+# Cap per list (decisions, action items, ...) fed into the final reduce
+REDUCE_MAX_ITEMS = 50
+
+# Account rate limits used to throttle chunk requests (defaults: gpt-4o-mini tier 1)
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "200000"))
+
+# Rough completion size reserved per request when estimating token usage
+ESTIMATED_OUTPUT_TOKENS = 1000
+
+# Words per extraction window when MOM generation is pipelined with transcription
+PIPELINE_WINDOW_WORDS = 3000
+
+# Batch API polling interval bounds (seconds)
+BATCH_POLL_INITIAL = 10
+BATCH_POLL_MAX = 300
+
+# System prompts are sent byte-identical on every call so OpenAI's automatic
+# prompt caching can reuse the prefix - never interpolate per-meeting data here
+SYSTEM_PROMPT = """You are a professional meeting assistant that creates clear, structured minutes of meetings. Analyze the meeting transcript provided by the user and generate a structured Minutes of Meeting (MOM).
+
+Please extract and format the following information in JSON format:
+
+1. **summary**: A comprehensive 3-5 sentence overview of what was discussed
+2. **key_points**: Array of main discussion points (5-8 bullet points)
+3. **decisions**: Array of decisions made, each with:
+   - decision: The decision text
+   - made_by: Who made the decision (if mentioned, otherwise "Team")
+   - timestamp: Approximate time in transcript (if possible)
+4. **action_items**: Array of tasks, each with:
+   - task: What needs to be done
+   - owner: Who is responsible (if mentioned, otherwise "Unassigned")
+   - deadline: Deadline if mentioned (otherwise "Not specified")
+   - priority: high/medium/low based on context
+5. **questions**: Array of unresolved questions or concerns raised
+6. **next_steps**: What should happen after this meeting
+7. **attendees**: List of people mentioned in the meeting (if identifiable)
+8. **topics_discussed**: Main topics/agenda items covered
+
+Return ONLY valid JSON, no additional text."""
+
+CHUNK_SYSTEM_PROMPT = """Analyze the portion of a meeting transcript provided by the user and extract key information.
+
+Extract:
+1. Key points discussed in this segment
+2. Any decisions made
+3. Any action items assigned
+4. Any questions raised
+
+Return as JSON with keys: key_points, decisions, action_items, questions"""
+
+FINAL_SYSTEM_PROMPT = """Based on the information the user extracted from a long meeting, create a comprehensive MOM.
+
+Create a final MOM with:
+1. summary: 3-5 sentence overall summary
+2. key_points: Top 8-10 most important points
+3. decisions: All decisions (remove duplicates)
+4. action_items: All action items (remove duplicates)
+5. questions: All unresolved questions
+6. next_steps: Recommended next steps
+7. attendees: People mentioned or speaking in the meeting (if identifiable)
+8. topics_discussed: Main topics covered
+
+Return valid JSON only."""
+
+class RateLimiter:
+    """
+    Token bucket over requests/minute and tokens/minute
+    
+    Requests are only released when both budgets cover them, so concurrent
+    chunk calls stay under the account limits instead of bouncing off 429s.
+    Must be created inside the running event loop.
+    """
+    
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.max_requests = requests_per_minute
+        self.max_tokens = tokens_per_minute
+        self.available_requests = requests_per_minute
+        self.available_tokens = tokens_per_minute
+        self.last_update = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.last_update
+        self.available_requests = min(self.max_requests, self.available_requests + elapsed * self.max_requests / 60)
+        self.available_tokens = min(self.max_tokens, self.available_tokens + elapsed * self.max_tokens / 60)
+        self.last_update = now
+    
+    async def acquire(self, tokens):
+        """Wait until one request and `tokens` tokens are available, then consume them"""
+        tokens = min(tokens, self.max_tokens)
+        
+        # Waiters queue on the lock, so capacity is handed out in arrival order
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.available_requests >= 1 and self.available_tokens >= tokens:
+                    self.available_requests -= 1
+                    self.available_tokens -= tokens
+                    return
+                
+                wait = max(
+                    (1 - self.available_requests) * 60 / self.max_requests,
+                    (tokens - self.available_tokens) * 60 / self.max_tokens,
+                    0.01
+                )
+                await asyncio.sleep(wait)
+
+def estimate_tokens(messages):
+    """Estimate tokens for a request (~4 characters per token, plus the expected completion)"""
+    return sum(len(message["content"]) for message in messages) // 4 + ESTIMATED_OUTPUT_TOKENS
+
+@functools.lru_cache(maxsize=1)
+def get_encoding():
+    """Tokenizer for gpt-4o-mini (loaded once, on first use)"""
+    import tiktoken
+    return tiktoken.encoding_for_model("gpt-4o-mini")
+
+def chunk_transcript(transcript_text, max_tokens=CHUNK_MAX_TOKENS):
     """
     Split long transcript into chunks for processing
     
+    Chunks are cut on exact gpt-4o-mini token counts, so each one is as large
+    as the budget allows without risking a context-length error.
+    
     Args:
         transcript_text: Full transcript text
-        max_words: Maximum words per chunk
+        max_tokens: Maximum tokens per chunk
     
     Returns:
         list: List of transcript chunks
     """
-    words = transcript_text.split()
-    chunks = []
-    
-    for i in range(0, len(words), max_words):
-        chunk = ' '.join(words[i:i + max_words])
-        chunks.append(chunk)
+    encoding = get_encoding()
+    tokens = encoding.encode(transcript_text)
     
-    return chunks
+    return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
 
-def generate_mom_for_long_meeting(transcript_file):
+def generate_mom_for_long_meeting(transcript_file, use_batch=False, force=False):
     """
     Generate MOM for long meetings by processing in chunks if needed
+    
+    Args:
+        transcript_file: Path to transcript JSON file
+        use_batch: Send chunks through the OpenAI Batch API (cheaper, but slow)
+        force: Call the model even if an identical request is in the MOM cache
     """
     
     print(f"📄 Reading transcript: {transcript_file}")
     
-    with open(transcript_file, 'r') as f:
-        transcript_data = json.load(f)
+    transcript_data = load_transcript(transcript_file)
     
     transcript_text = transcript_data.get('text', '')
     duration = transcript_data.get('duration', 0)
@@ -50,74 +189,62 @@ def generate_mom_for_long_meeting(transcript_file):
         print("❌ Error: Transcript is empty!")
         return None
     
-    word_count = len(transcript_text.split())
+    word_count = count_words(transcript_text)
+    token_count = len(get_encoding().encode(transcript_text))
     print(f"📝 Transcript stats:")
     print(f"   Duration: {duration/60:.1f} minutes")
     print(f"   Characters: {len(transcript_text):,}")
     print(f"   Words: {word_count:,}")
+    print(f"   Tokens: {token_count:,}")
     
-    # Check if transcript is too long (>4000 words = potential token limit issue)
-    if word_count > 4000:
-        print(f"⚠️  Long transcript detected ({word_count} words)")
+    # One long-context call handles typical meetings; chunking is a last resort
+    # for transcripts that would not fit in the context window
+    if token_count > MAX_SINGLE_CALL_TOKENS:
+        print(f"⚠️  Transcript exceeds the single-call budget ({token_count:,} > {MAX_SINGLE_CALL_TOKENS:,} tokens)")
         print("   Using chunked processing strategy...")
-        return generate_mom_chunked(transcript_text, transcript_data)
+        if use_batch:
+            return generate_mom_chunked_batch(transcript_text, transcript_data)
+        return asyncio.run(generate_mom_chunked(transcript_text, transcript_data))
     else:
         print("   Normal processing (transcript size is manageable)")
-        return generate_mom_normal(transcript_text, transcript_data)
+        return generate_mom_normal(transcript_text, transcript_data, force=force)
 
-def generate_mom_normal(transcript_text, transcript_data):
-    """Generate MOM for normal-length transcripts"""
+def generate_mom_normal(transcript_text, transcript_data, force=False):
+    """Generate MOM for normal-length transcripts (force skips the MOM cache)"""
     
     print("🤖 Generating MOM with GPT-4...")
     print("⏳ This may take 30-60 seconds...")
     
     from datetime import datetime
     
-    prompt = f"""You are an expert meeting assistant. Analyze the following meeting transcript and generate a structured Minutes of Meeting (MOM).
-
-TRANSCRIPT:
-{transcript_text}
-
-Please extract and format the following information in JSON format:
-
-1. **summary**: A comprehensive 3-5 sentence overview of what was discussed
-2. **key_points**: Array of main discussion points (5-8 bullet points)
-3. **decisions**: Array of decisions made, each with:
-   - decision: The decision text
-   - made_by: Who made the decision (if mentioned, otherwise "Team")
-   - timestamp: Approximate time in transcript (if possible)
-4. **action_items**: Array of tasks, each with:
-   - task: What needs to be done
-   - owner: Who is responsible (if mentioned, otherwise "Unassigned")
-   - deadline: Deadline if mentioned (otherwise "Not specified")
-   - priority: high/medium/low based on context
-5. **questions**: Array of unresolved questions or concerns raised
-6. **next_steps**: What should happen after this meeting
-7. **attendees**: List of people mentioned in the meeting (if identifiable)
-8. **topics_discussed**: Main topics/agenda items covered
-
-Return ONLY valid JSON, no additional text.
-"""
+    model = "gpt-4o-mini"
+    # Fixed instructions first, transcript last - keeps the prefix cacheable
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"TRANSCRIPT:\n{transcript_text}"}
+    ]
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a professional meeting assistant that creates clear, structured minutes of meetings. Always respond with valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            response_format={"type": "json_object"}
-        )
+        # Reuse the MOM from an identical earlier request, if any
+        cache_key = mom_cache.cache_key(model, messages, LongMeetingMoM)
+        mom = None if force else mom_cache.load(cache_key)
         
-        mom_json = response.choices[0].message.content
-        mom = json.loads(mom_json)
+        if mom is None:
+            response = _get_client().beta.chat.completions.parse(
+                model=model,
+                messages=messages,
+                temperature=0.3,
+                response_format=LongMeetingMoM
+            )
+            
+            mom = parsed_dict(response)
+            mom_cache.store(cache_key, mom)
         
         # Add metadata
         mom['metadata'] = {
             'generated_at': datetime.now().isoformat(),
             'duration': transcript_data.get('duration', 0),
-            'word_count': len(transcript_text.split()),
+            'word_count': count_words(transcript_text),
             'processing_method': 'normal'
         }
         
@@ -128,126 +255,400 @@ Return ONLY valid JSON, no additional text.
         print(f"❌ Error generating MOM: {e}")
         return None
 
-def generate_mom_chunked(transcript_text, transcript_data):
-    """Generate MOM for very long transcripts using chunked processing"""
+def _chunk_messages(chunk):
+    """Build the extraction messages for one transcript chunk"""
     
-    from datetime import datetime
-    
-    print("🔀 Processing in chunks...")
+    return [
+        {"role": "system", "content": CHUNK_SYSTEM_PROMPT},
+        {"role": "user", "content": f"TRANSCRIPT SEGMENT:\n{chunk}"}
+    ]
+
+def _bullets(items, describe):
+    """Render up to REDUCE_MAX_ITEMS extracted items as a "- ..." list (dicts go through `describe`)"""
+    lines = [f"- {describe(item) if isinstance(item, dict) else item}" for item in items[:REDUCE_MAX_ITEMS]]
+    return "\n".join(lines) or "- None"
+
+def _final_messages(chunk_results):
+    """
+    Merge per-chunk extractions into the messages for the final MOM call
     
-    # Split into chunks
-    chunks = chunk_transcript(transcript_text, max_words=3000)
-    print(f"   Split into {len(chunks)} chunks")
+    Args:
+        chunk_results: Parsed chunk results in transcript order (failed
+                       chunks are Exceptions or None and are skipped)
     
+    Returns:
+        list: Chat messages for the final comprehensive MOM
+    """
     chunk_summaries = []
     all_decisions = []
     all_action_items = []
     all_questions = []
     
-    # Process each chunk
-    for i, chunk in enumerate(chunks, 1):
-        print(f"\n   Processing chunk {i}/{len(chunks)}...")
+    # Collect results in transcript order
+    for i, chunk_result in enumerate(chunk_results, 1):
+        if isinstance(chunk_result, Exception) or chunk_result is None:
+            print(f"   ⚠️  Error in chunk {i}: {chunk_result or 'no result returned'}")
+            continue
         
-        prompt = f"""Analyze this portion of a meeting transcript and extract key information.
+        if chunk_result.get('key_points'):
+            chunk_summaries.extend(chunk_result['key_points'])
+        if chunk_result.get('decisions'):
+            all_decisions.extend(chunk_result['decisions'])
+        if chunk_result.get('action_items'):
+            all_action_items.extend(chunk_result['action_items'])
+        if chunk_result.get('questions'):
+            all_questions.extend(chunk_result['questions'])
+    
+    # Plain bullets instead of JSON - far fewer tokens for the same content
+    combined_info = f"""
+Key Points:
+{_bullets(chunk_summaries[:20], str)}
 
-TRANSCRIPT SEGMENT:
-{chunk}
+Decisions:
+{_bullets(all_decisions, lambda d: f"{d.get('decision', '')} (by {d.get('made_by', 'Team')})")}
 
-Extract:
-1. Key points discussed in this segment
-2. Any decisions made
-3. Any action items assigned
-4. Any questions raised
+Action Items:
+{_bullets(all_action_items, lambda a: f"{a.get('task', '')} (owner: {a.get('owner', 'Unassigned')}, deadline: {a.get('deadline', 'Not specified')}, priority: {a.get('priority', 'medium')})")}
 
-Return as JSON with keys: key_points, decisions, action_items, questions
+Questions:
+{_bullets(all_questions, str)}
 """
-        
-        try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "Extract key information from meeting segments. Return valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                response_format={"type": "json_object"}
-            )
-            
-            chunk_result = json.loads(response.choices[0].message.content)
-            
-            # Collect results
-            if chunk_result.get('key_points'):
-                chunk_summaries.extend(chunk_result['key_points'])
-            if chunk_result.get('decisions'):
-                all_decisions.extend(chunk_result['decisions'])
-            if chunk_result.get('action_items'):
-                all_action_items.extend(chunk_result['action_items'])
-            if chunk_result.get('questions'):
-                all_questions.extend(chunk_result['questions'])
-            
-            print(f"   ✅ Chunk {i} processed")
-            
-        except Exception as e:
-            print(f"   ⚠️  Error in chunk {i}: {e}")
-            continue
     
-    # Now create final comprehensive summary
-    print("\n🔄 Creating final comprehensive MOM...")
+    return [
+        {"role": "system", "content": FINAL_SYSTEM_PROMPT},
+        {"role": "user", "content": f"EXTRACTED INFORMATION:\n{combined_info}"}
+    ]
+
+def _final_mom(mom, transcript_text, transcript_data, chunks, method):
+    """Attach metadata to the final MOM"""
     
-    combined_info = f"""
-Key Points: {json.dumps(chunk_summaries[:20])}  
-Decisions: {json.dumps(all_decisions)}
-Action Items: {json.dumps(all_action_items)}
-Questions: {json.dumps(all_questions)}
-"""
+    from datetime import datetime
     
-    final_prompt = f"""Based on the extracted information from a long meeting, create a comprehensive MOM.
-
-EXTRACTED INFORMATION:
-{combined_info}
+    # Add metadata
+    mom['metadata'] = {
+        'generated_at': datetime.now().isoformat(),
+        'duration': transcript_data.get('duration', 0),
+        'word_count': count_words(transcript_text),
+        'chunks_processed': len(chunks),
+        'processing_method': method
+    }
+    
+    print("✅ Comprehensive MOM generated!")
+    return mom
 
-Create a final MOM with:
-1. summary: 3-5 sentence overall summary
-2. key_points: Top 8-10 most important points
-3. decisions: All decisions (remove duplicates)
-4. action_items: All action items (remove duplicates)
-5. questions: All unresolved questions
-6. next_steps: Recommended next steps
-7. topics_discussed: Main topics covered
+async def _process_chunk(aclient, i, chunk, total, sem, limiter):
+    """Extract key information from one transcript chunk (bounded by `sem` and `limiter`)"""
+    
+    messages = _chunk_messages(chunk)
+    
+    async with sem:
+        await limiter.acquire(estimate_tokens(messages))
+        print(f"\n   Processing chunk {i}/{total}...")
+        response = await aclient.beta.chat.completions.parse(
+            model="gpt-4o-mini",
+            messages=messages,
+            temperature=0.3,
+            response_format=ChunkExtract
+        )
+    
+    print(f"   ✅ Chunk {i} processed")
+    return parsed_dict(response)
 
-Return valid JSON only.
-"""
+async def generate_mom_chunked(transcript_text, transcript_data):
+    """
+    Generate MOM for very long transcripts using chunked processing
+    
+    Only used for transcripts beyond MAX_SINGLE_CALL_TOKENS - everything else
+    goes through a single generate_mom_normal call.
+    """
+    
+    print("🔀 Processing in chunks...")
+    
+    # Split into chunks
+    chunks = chunk_transcript(transcript_text)
+    print(f"   Split into {len(chunks)} chunks (up to {OPENAI_MAX_CONCURRENCY} in parallel)")
+    
+    # Async client lives for this run only (its connection pool is bound to the event loop)
+    # The SDK's own backoff on 429/timeouts is the safety net behind the limiter
+    # HTTP/2 multiplexes the fanned-out chunk requests over a few connections
+    import httpx
+    from openai import AsyncOpenAI
+    
+    aclient = AsyncOpenAI(
+        api_key=env.OPENAI_API_KEY,
+        max_retries=5,
+        http_client=httpx.AsyncClient(http2=True, limits=httpx.Limits(max_keepalive_connections=20))
+    )
     
     try:
-        response = client.chat.completions.create(
+        # Process all chunks concurrently, bounded by the semaphore and rate limits
+        sem = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+        limiter = RateLimiter(OPENAI_RPM, OPENAI_TPM)
+        chunk_results = await asyncio.gather(
+            *[_process_chunk(aclient, i, chunk, len(chunks), sem, limiter) for i, chunk in enumerate(chunks, 1)],
+            return_exceptions=True
+        )
+        
+        # Now create final comprehensive summary
+        print("\n🔄 Creating final comprehensive MOM...")
+        
+        final_messages = _final_messages(chunk_results)
+        await limiter.acquire(estimate_tokens(final_messages))
+        response = await aclient.beta.chat.completions.parse(
             model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "Create comprehensive meeting minutes. Return valid JSON."},
-                {"role": "user", "content": final_prompt}
-            ],
+            messages=final_messages,
             temperature=0.3,
-            response_format={"type": "json_object"}
+            response_format=LongMeetingMoM
         )
         
-        mom = json.loads(response.choices[0].message.content)
+        return _final_mom(parsed_dict(response), transcript_text, transcript_data, chunks, 'chunked')
         
-        # Add metadata
-        mom['metadata'] = {
-            'generated_at': datetime.now().isoformat(),
-            'duration': transcript_data.get('duration', 0),
-            'word_count': len(transcript_text.split()),
-            'chunks_processed': len(chunks),
-            'processing_method': 'chunked'
-        }
+    except Exception as e:
+        print(f"❌ Error creating final MOM: {e}")
+        return None
+    finally:
+        await aclient.close()
+
+def _run_batch(requests_by_id):
+    """
+    Run chat completion requests through the OpenAI Batch API and wait for them
+    
+    Args:
+        requests_by_id: Dict of custom_id -> chat.completions request body
+    
+    Returns:
+        dict: custom_id -> message content (missing for failed requests),
+              or None if the batch did not complete
+    """
+    lines = [
+        json.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body})
+        for custom_id, body in requests_by_id.items()
+    ]
+    batch_input = _get_client().files.create(
+        file=("mom_chunks.jsonl", "\n".join(lines).encode()),
+        purpose="batch"
+    )
+    batch = _get_client().batches.create(
+        input_file_id=batch_input.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    print(f"   📦 Submitted batch {batch.id} ({len(lines)} requests)")
+    
+    # Poll with exponential backoff - batches can take minutes to hours
+    delay = BATCH_POLL_INITIAL
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        print(f"   ⏳ Batch status: {batch.status} - checking again in {delay}s...")
+        time.sleep(delay)
+        delay = min(delay * 2, BATCH_POLL_MAX)
+        batch = _get_client().batches.retrieve(batch.id)
+    
+    if batch.status != "completed" or not batch.output_file_id:
+        print(f"❌ Batch {batch.id} ended with status: {batch.status}")
+        return None
+    
+    results = {}
+    for line in _get_client().files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        if item.get("error") or not item.get("response") or item["response"]["status_code"] != 200:
+            continue
+        results[item["custom_id"]] = item["response"]["body"]["choices"][0]["message"]["content"]
+    
+    # Requests that errored land in a separate error file, not the output
+    failed = len(requests_by_id) - len(results)
+    if failed:
+        print(f"   ⚠️  {failed}/{len(requests_by_id)} batch requests failed - their chunks will be skipped")
+        if batch.error_file_id:
+            print(f"      Details in batch error file {batch.error_file_id}")
+    
+    return results
+
+def _parse_chunk_output(custom_id, content):
+    """
+    Parse one chunk's json_object reply from a batch
+    
+    Returns:
+        dict: Extracted chunk data, or None if the reply is missing or not
+              a JSON object (e.g. truncated) - that chunk is skipped
+    """
+    if content is None:
+        return None
+    
+    try:
+        chunk_result = json.loads(content)
+    except ValueError as e:
+        print(f"   ⚠️  Unreadable reply for {custom_id}: {e}")
+        return None
+    
+    if not isinstance(chunk_result, dict):
+        print(f"   ⚠️  Unexpected reply for {custom_id}: not a JSON object")
+        return None
+    
+    return chunk_result
+
+def generate_mom_chunked_batch(transcript_text, transcript_data):
+    """
+    Generate MOM for very long transcripts through the OpenAI Batch API
+    
+    Half the token cost of the realtime path and no RPM pressure, but the
+    batch may take up to 24h - meant for non-interactive bulk processing.
+    """
+    
+    print("🔀 Processing in chunks via the Batch API...")
+    
+    chunks = chunk_transcript(transcript_text)
+    print(f"   Split into {len(chunks)} chunks")
+    
+    try:
+        chunk_outputs = _run_batch({
+            f"chunk-{i}": {
+                "model": "gpt-4o-mini",
+                "messages": _chunk_messages(chunk),
+                "temperature": 0.3,
+                "response_format": {"type": "json_object"}
+            }
+            for i, chunk in enumerate(chunks, 1)
+        })
         
-        print("✅ Comprehensive MOM generated!")
-        return mom
+        if chunk_outputs is None:
+            return None
+        
+        # One bad reply only loses its own chunk, not the whole batch
+        chunk_results = [
+            _parse_chunk_output(f"chunk-{i}", chunk_outputs.get(f"chunk-{i}"))
+            for i in range(1, len(chunks) + 1)
+        ]
+        
+        # The final reduce is a single call - no need to wait on another batch
+        print("\n🔄 Creating final comprehensive MOM...")
+        
+        response = _get_client().beta.chat.completions.parse(
+            model="gpt-4o-mini",
+            messages=_final_messages(chunk_results),
+            temperature=0.3,
+            response_format=LongMeetingMoM
+        )
+        
+        return _final_mom(parsed_dict(response), transcript_text, transcript_data, chunks, 'chunked_batch')
         
     except Exception as e:
         print(f"❌ Error creating final MOM: {e}")
         return None
 
+def _extract_chunk(i, chunk):
+    """Extract key information from one transcript window (blocking, for the pipeline pool)"""
+    
+    print(f"\n   Processing window {i}...")
+    response = _get_client().beta.chat.completions.parse(
+        model="gpt-4o-mini",
+        messages=_chunk_messages(chunk),
+        temperature=0.3,
+        response_format=ChunkExtract
+    )
+    
+    print(f"   ✅ Window {i} processed")
+    return parsed_dict(response)
+
+def transcribe_and_generate_mom(audio_file, force=False):
+    """
+    Transcribe a recording and generate its MOM with the two stages overlapped
+    
+    Transcript parts are buffered in order as Whisper returns them; each time
+    ~PIPELINE_WINDOW_WORDS words are ready the window is sent for extraction
+    while later parts are still transcribing, and the final reduce runs once
+    transcription is done. Recordings that fit in one window skip the
+    map-reduce and go through a single generate_mom_normal call.
+    
+    Args:
+        audio_file: Path to audio/video file
+        force: Call Whisper and the model even if this recording's transcript
+               or MOM request is cached
+    
+    Returns:
+        tuple: (transcript_result, mom) - either may be None on failure
+    """
+    parts = {}
+    window = []
+    window_words = 0
+    next_index = 0
+    extractions = []
+    
+    # Build the client before the extraction threads race to create their own
+    _get_client()
+    
+    with ThreadPoolExecutor(max_workers=OPENAI_MAX_CONCURRENCY) as pool:
+        
+        def submit_window():
+            nonlocal window, window_words
+            extractions.append(pool.submit(_extract_chunk, len(extractions) + 1, " ".join(window)))
+            window, window_words = [], 0
+        
+        def on_part(index, part):
+            nonlocal next_index, window_words
+            parts[index] = part['text'].strip()
+            # Parts finish out of order - only a contiguous prefix may join the window
+            while next_index in parts:
+                text = parts.pop(next_index)
+                next_index += 1
+                window.append(text)
+                window_words += count_words(text)
+                if window_words >= PIPELINE_WINDOW_WORDS:
+                    submit_window()
+        
+        transcript_result = transcribe_audio(audio_file, on_part=on_part, force=force)
+        
+        if not transcript_result:
+            for future in extractions:
+                future.cancel()
+            return None, None
+        
+        transcript_text = transcript_result['text']
+        
+        # Short meeting: nothing was sent early, one call beats extract + reduce
+        if not extractions:
+            return transcript_result, generate_mom_normal(transcript_text, transcript_result, force=force)
+        
+        if window:
+            submit_window()
+        
+        print(f"\n🔄 Waiting on {len(extractions)} window extractions...")
+        chunk_results = []
+        for future in extractions:
+            try:
+                chunk_results.append(future.result())
+            except Exception as e:
+                chunk_results.append(e)
+    
+    try:
+        print("\n🔄 Creating final comprehensive MOM...")
+        response = _get_client().beta.chat.completions.parse(
+            model="gpt-4o-mini",
+            messages=_final_messages(chunk_results),
+            temperature=0.3,
+            response_format=LongMeetingMoM
+        )
+        
+        return transcript_result, _final_mom(parsed_dict(response), transcript_text, transcript_result, extractions, 'pipelined')
+        
+    except Exception as e:
+        print(f"❌ Error creating final MOM: {e}")
+        return transcript_result, None
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process a long meeting recording")
+    parser.add_argument("--batch", action="store_true",
+                        help="Use the OpenAI Batch API for chunked MOM generation (50%% cheaper, up to 24h)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Start MOM extraction on transcript parts while the rest is still transcribing")
+    parser.add_argument("--force", action="store_true",
+                        help="Redo transcription and MOM even if outputs for this recording already exist")
+    args = parser.parse_args()
+    
+    # Show transcription progress alongside our own output
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    
     print("🎬 Long Meeting Processor")
     print("="*60)
     
@@ -264,32 +665,58 @@ if __name__ == "__main__":
     print("🚀 STARTING PROCESSING")
     print("="*60)
     
+    transcript_file = str(transcript_path_for(audio_file))
+    mom_file = Path(audio_file).with_name(Path(audio_file).stem + '_mom.json')
+    source = audio_fingerprint(audio_file)
+    
+    # Outputs of an earlier run are reused unless the recording changed (or --force)
+    transcript_result = None if args.force else load_saved_transcript(audio_file)
+    mom_data = None
+    mom_reused = False
+    if transcript_result and mom_file.exists():
+        with open(mom_file, 'r') as f:
+            saved_mom = json.load(f)
+        if saved_mom.get('metadata', {}).get('source') == source:
+            mom_data = saved_mom
+            mom_reused = True
+    
     # Step 1: Transcribe
     print("\n📍 STEP 1/3: Transcribing audio...")
-    print("⏳ For a long meeting, this will take several minutes...")
     
-    transcript_result = transcribe_audio(audio_file)
+    if transcript_result:
+        print(f"♻️  Reusing saved transcript: {transcript_file}")
+    elif args.pipeline:
+        print("⏳ For a long meeting, this will take several minutes...")
+        # Steps 1 and 2 overlap: MOM extraction starts on the first transcribed parts
+        transcript_result, mom_data = transcribe_and_generate_mom(audio_file, force=args.force)
+    else:
+        print("⏳ For a long meeting, this will take several minutes...")
+        transcript_result = transcribe_audio(audio_file, force=args.force)
     
     if not transcript_result:
         print("❌ Transcription failed.")
         sys.exit(1)
     
-    transcript_file = audio_file.replace('.mp3', '_transcript.json').replace('.webm', '_transcript.json')
-    
     # Step 2: Generate MOM
     print("\n📍 STEP 2/3: Generating MOM...")
-    mom_data = generate_mom_for_long_meeting(transcript_file)
     
-    if not mom_data:
-        print("❌ MOM generation failed.")
-        sys.exit(1)
-    
-    # Save MOM
-    mom_file = audio_file.replace('.mp3', '_mom.json').replace('.webm', '_mom.json')
-    with open(mom_file, 'w') as f:
-        json.dump(mom_data, f, indent=2)
-    
-    print(f"💾 Saved MOM to: {mom_file}")
+    if mom_reused:
+        print(f"♻️  Reusing saved MOM: {mom_file}")
+    else:
+        # A --pipeline run has usually produced it already
+        if mom_data is None:
+            mom_data = generate_mom_for_long_meeting(transcript_file, use_batch=args.batch, force=args.force)
+        
+        if not mom_data:
+            print("❌ MOM generation failed.")
+            sys.exit(1)
+        
+        # Save MOM, tagged with the recording it came from
+        mom_data.setdefault('metadata', {})['source'] = source
+        with open(mom_file, 'w') as f:
+            json.dump(mom_data, f, indent=2)
+        
+        print(f"💾 Saved MOM to: {mom_file}")
     
     # Print summary
     print("\n" + "="*60)
@@ -4,11 +4,13 @@ Complete workflow: Audio → Transcript → MOM → Email
 
 import os
 import sys
-from transcribe_audio import transcribe_audio
+import argparse
+import logging
+from transcribe_audio import transcribe_audio, load_saved_transcript, transcript_path_for
 from generate_mom import generate_mom
 from email_service import send_mom_email
 
-def process_meeting_complete(audio_file, recipient_emails, meeting_title=None):
+def process_meeting_complete(audio_file, recipient_emails, meeting_title=None, pipelined=False, force=False):
     """
     Complete workflow to process a meeting recording
     
@@ -16,6 +18,10 @@ def process_meeting_complete(audio_file, recipient_emails, meeting_title=None):
         audio_file: Path to audio file
         recipient_emails: Email(s) to send MOM to (string or list)
         meeting_title: Optional meeting title
+        pipelined: Start MOM extraction while later audio parts are still
+                   transcribing (map-reduce over ~3k-word windows)
+        force: Re-transcribe and regenerate the MOM even if an earlier run
+               saved or cached them for this exact recording
     
     Returns:
         dict: Status of each step
@@ -31,20 +37,37 @@ def process_meeting_complete(audio_file, recipient_emails, meeting_title=None):
         "email": None
     }
     
-    # Step 1: Transcribe
-    print("\n📍 STEP 1/3: Transcribing audio...")
-    transcript_result = transcribe_audio(audio_file)
+    # Reuse the transcript of an earlier run unless the recording has changed
+    transcript_result = None if force else load_saved_transcript(audio_file)
+    mom_pending = True
+    
+    if transcript_result:
+        print(f"\n📍 STEP 1/3: Reusing saved transcript {transcript_path_for(audio_file)}")
+    elif pipelined:
+        # Imported here - the long-meeting module pulls in tiktoken, which the
+        # plain path never needs
+        from process_long_meeting import transcribe_and_generate_mom
+        
+        # Steps 1 and 2 overlap: extraction starts on the first transcribed parts
+        print("\n📍 STEP 1-2/3: Transcribing audio and generating MOM...")
+        transcript_result, mom_data = transcribe_and_generate_mom(audio_file, force=force)
+        mom_pending = False
+    else:
+        # Step 1: Transcribe (saved next to the recording so reruns can skip it)
+        print("\n📍 STEP 1/3: Transcribing audio...")
+        transcript_result = transcribe_audio(audio_file, force=force)
     
     if not transcript_result:
         print("❌ Transcription failed. Aborting.")
         return result
     
     result["transcription"] = "success"
-    transcript_file = audio_file.replace('.mp3', '_transcript.json').replace('.webm', '_transcript.json')
     
-    # Step 2: Generate MOM
-    print("\n📍 STEP 2/3: Generating MOM...")
-    mom_data = generate_mom(transcript_file)
+    if mom_pending:
+        # Step 2: Generate MOM (straight from memory - no transcript file round-trip;
+        # an unchanged transcript is answered from the MOM cache)
+        print("\n📍 STEP 2/3: Generating MOM...")
+        mom_data = generate_mom(transcript_result, force=force)
     
     if not mom_data:
         print("❌ MOM generation failed. Aborting.")
@@ -80,6 +103,16 @@ def process_meeting_complete(audio_file, recipient_emails, meeting_title=None):
     return result
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process a meeting recording end to end")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-transcribe and regenerate the MOM even if earlier outputs for this recording exist")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Start MOM extraction on transcript parts while the rest is still transcribing")
+    args = parser.parse_args()
+    
+    # Show transcription progress alongside our own output
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    
     print("🎬 Complete Meeting Processor")
     print("="*60)
     
@@ -107,7 +140,7 @@ if __name__ == "__main__":
         meeting_title = "Team Meeting"
     
     # Process
-    result = process_meeting_complete(audio_file, recipients, meeting_title)
+    result = process_meeting_complete(audio_file, recipients, meeting_title, pipelined=args.pipeline, force=args.force)
     
     print("\n" + "="*60)
     print("📊 FINAL STATUS")
@@ -0,0 +1,71 @@
+"""
+Tests for send_mom_email rendering and recipient validation
+
+Run with: python -m unittest test_email_service
+No email is sent - every test runs with MOM_DRY_RUN on or fails validation first.
+"""
+
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime
+from io import StringIO
+from unittest import mock
+
+import email_service
+
+MOM = {
+    "summary": "Agreed on the <Q4> launch plan",
+    "key_points": ["Launch moves to November"],
+    "decisions": [],
+    "action_items": [],
+    "questions": [],
+    "next_steps": "Draft the announcement",
+    "attendees": ["Priya", "Sam"],
+    "metadata": {"generated_at": "2024-03-05T10:00:00"}
+}
+
+class SendMomEmailTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(email_service, "MOM_DRY_RUN", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def send(self, to_emails, mom_data=MOM):
+        with redirect_stdout(StringIO()):
+            return email_service.send_mom_email(to_emails, mom_data, "Launch sync")
+
+    def test_dry_run_renders_without_sending(self):
+        with mock.patch.object(email_service, "_SG_CLIENT") as client:
+            result = self.send("priya@example.com")
+
+        client.send.assert_not_called()
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["recipients"], ["priya@example.com"])
+        self.assertIn("2024-03-05", result["html"])
+        self.assertIn("&lt;Q4&gt;", result["html"])
+
+    def test_invalid_addresses_are_skipped(self):
+        result = self.send([" priya@example.com ", "not-an-email", "sam@example"])
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["recipients"], ["priya@example.com"])
+        self.assertEqual(result["invalid"], ["not-an-email", "sam@example"])
+
+    def test_no_valid_recipients(self):
+        for to_emails in (None, [], "", ["bad"]):
+            with self.subTest(to_emails=to_emails):
+                result = self.send(to_emails)
+                self.assertEqual(result["status"], "error")
+                self.assertEqual(result["message"], "No valid recipient email addresses")
+
+    def test_missing_date_uses_today_on_every_render(self):
+        mom = {key: value for key, value in MOM.items() if key != "metadata"}
+
+        for today in ("2024-03-05", "2024-03-06"):
+            with self.subTest(today=today), mock.patch.object(email_service, "datetime") as clock:
+                clock.now.return_value = datetime.fromisoformat(f"{today}T09:00:00")
+                self.assertIn(today, self.send("priya@example.com", mom)["html"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Unit tests for generate_mom (the model is mocked - no API calls)
+
+Run with: python -m unittest test_generate_mom
+"""
+
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+import generate_mom
+
+TRANSCRIPT = {"text": "We agreed to ship on Friday.", "duration": 60}
+
+MOM = {
+    "summary": "Ship on Friday",
+    "key_points": [],
+    "decisions": [],
+    "action_items": [],
+    "questions": [],
+    "next_steps": "Ship",
+    "attendees": []
+}
+
+class MomCacheUseTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(generate_mom, "_get_client")
+        client = patcher.start()()
+        self.addCleanup(patcher.stop)
+        self.parse = client.beta.chat.completions.parse
+        self.parse.return_value.choices[0].message.parsed.model_dump.return_value = dict(MOM)
+
+        patcher = mock.patch.object(generate_mom, "mom_cache")
+        self.mom_cache = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mom_cache.load.return_value = dict(MOM, summary="Cached")
+
+    def generate(self, **kwargs):
+        with redirect_stdout(StringIO()):
+            return generate_mom.generate_mom(dict(TRANSCRIPT), **kwargs)
+
+    def test_cache_hit_skips_the_model(self):
+        self.assertEqual(self.generate()["summary"], "Cached")
+        self.parse.assert_not_called()
+
+    def test_force_calls_the_model(self):
+        self.assertEqual(self.generate(force=True)["summary"], "Ship on Friday")
+        self.mom_cache.load.assert_not_called()
+        self.parse.assert_called_once()
+        self.mom_cache.store.assert_called_once()
+
+class SaveMomTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+
+    def save(self, transcript_file):
+        with redirect_stdout(StringIO()):
+            return Path(generate_mom.save_mom({"summary": "Planning"}, str(transcript_file)))
+
+    def test_replaces_transcript_suffix(self):
+        self.assertEqual(self.save(self.tmp / "standup_transcript.json"), self.tmp / "standup_mom.json")
+
+    def test_gzipped_transcript(self):
+        self.assertEqual(self.save(self.tmp / "standup_transcript.json.gz"), self.tmp / "standup_mom.json")
+
+    def test_directory_names_are_left_alone(self):
+        folder = self.tmp / "old_transcript.json"
+        folder.mkdir()
+        self.assertEqual(self.save(folder / "standup_transcript.json"), folder / "standup_mom.json")
+
+    def test_never_overwrites_a_differently_named_transcript(self):
+        transcript = self.tmp / "notes.json"
+        transcript.write_text('{"text": "hello"}')
+
+        output_file = self.save(transcript)
+
+        self.assertEqual(output_file, self.tmp / "notes_mom.json")
+        self.assertEqual(json.loads(transcript.read_text()), {"text": "hello"})
+        self.assertEqual(json.loads(output_file.read_text()), {"summary": "Planning"})
+
+if __name__ == "__main__":
+    unittest.main()
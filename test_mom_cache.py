@@ -0,0 +1,69 @@
+"""
+Round-trip tests for the on-disk MOM cache
+
+Run with: python -m unittest test_mom_cache
+"""
+
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+import mom_cache
+from mom_schema import LongMeetingMoM, MoM
+
+class MomCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = Path(tmp.name)
+        patcher = mock.patch.object(mom_cache, "CACHE_DIR", self.cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def load(self, key):
+        with redirect_stdout(StringIO()):
+            return mom_cache.load(key)
+
+    def test_key_changes_with_model_and_messages(self):
+        messages = [{"role": "user", "content": "transcript"}]
+        key = mom_cache.cache_key("gpt-4o-mini", messages)
+
+        self.assertEqual(key, mom_cache.cache_key("gpt-4o-mini", [dict(m) for m in messages]))
+        self.assertNotEqual(key, mom_cache.cache_key("gpt-4o", messages))
+        self.assertNotEqual(key, mom_cache.cache_key("gpt-4o-mini", [{"role": "user", "content": "other"}]))
+
+    def test_key_changes_with_response_schema(self):
+        messages = [{"role": "user", "content": "transcript"}]
+        keys = {
+            mom_cache.cache_key("gpt-4o-mini", messages),
+            mom_cache.cache_key("gpt-4o-mini", messages, MoM),
+            mom_cache.cache_key("gpt-4o-mini", messages, LongMeetingMoM)
+        }
+
+        self.assertEqual(len(keys), 3)
+        self.assertIn(mom_cache.cache_key("gpt-4o-mini", messages, MoM), keys)
+
+    def test_store_then_load(self):
+        mom = {"summary": "Planning", "action_items": [{"task": "Ship it", "owner": "Team"}]}
+        mom_cache.store("abc", mom)
+
+        self.assertEqual(self.load("abc"), mom)
+
+    def test_concurrent_stores_of_one_key(self):
+        moms = [{"summary": f"Version {i}", "key_points": ["x" * 10_000]} for i in range(16)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda mom: mom_cache.store("abc", mom), moms))
+
+        self.assertIn(self.load("abc"), moms)
+        self.assertEqual(list(self.cache_dir.glob("*.tmp")), [])
+
+    def test_miss(self):
+        self.assertIsNone(mom_cache.load("missing"))
+
+if __name__ == "__main__":
+    unittest.main()
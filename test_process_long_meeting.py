@@ -0,0 +1,55 @@
+"""
+Unit tests for the long-meeting helpers (no API calls)
+
+Run with: python -m unittest test_process_long_meeting
+"""
+
+import asyncio
+import time
+import unittest
+
+import generate_mom
+import process_long_meeting
+
+class ClientTest(unittest.TestCase):
+
+    def test_shares_the_generate_mom_client(self):
+        # One HTTP/2 pool per process, whichever path builds it first
+        self.assertIs(process_long_meeting._get_client, generate_mom._get_client)
+
+class RateLimiterTest(unittest.TestCase):
+
+    def test_consumes_both_budgets(self):
+        async def run():
+            limiter = process_long_meeting.RateLimiter(requests_per_minute=60, tokens_per_minute=10_000)
+            await limiter.acquire(2_500)
+            await limiter.acquire(2_500)
+            return limiter
+
+        limiter = asyncio.run(run())
+
+        self.assertAlmostEqual(limiter.available_requests, 58, delta=0.1)
+        self.assertAlmostEqual(limiter.available_tokens, 5_000, delta=10)
+
+    def test_waits_for_the_request_budget_to_refill(self):
+        async def run():
+            # 600 RPM refills one request every 0.1s
+            limiter = process_long_meeting.RateLimiter(requests_per_minute=600, tokens_per_minute=1_000_000)
+            limiter.available_requests = 0
+            start = time.monotonic()
+            await limiter.acquire(1)
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(run()), 0.08)
+
+    def test_oversized_request_is_capped_at_the_token_budget(self):
+        async def run():
+            limiter = process_long_meeting.RateLimiter(requests_per_minute=60, tokens_per_minute=1_000)
+            # More tokens than a full minute's budget must not wait forever
+            await asyncio.wait_for(limiter.acquire(5_000), timeout=1)
+            return limiter
+
+        self.assertLess(asyncio.run(run()).available_tokens, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+"""
+Unit tests for the helpers in transcribe_audio (no ffmpeg or API calls)
+
+Run with: python -m unittest test_transcribe_audio
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import httpx
+import openai
+
+import transcribe_audio
+
+def _part(text, duration, segments):
+    """Per-part transcript dict as _to_result builds it"""
+    return {
+        "text": text,
+        "language": "en",
+        "duration": duration,
+        "segments": [{"start": start, "end": end, "text": text} for start, end in segments]
+    }
+
+def _status_error(status):
+    request = httpx.Request("POST", "https://api.openai.com/v1/audio/transcriptions")
+    return openai.APIStatusError("error", response=httpx.Response(status, request=request), body=None)
+
+class TranscriptCacheUseTest(unittest.TestCase):
+
+    def setUp(self):
+        for name, value in (("file_key", "key"), ("load", {"text": "cached"})):
+            patcher = mock.patch.object(transcribe_audio.transcript_cache, name, return_value=value)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+        # Stop right after the cache check - nothing is uploaded
+        patcher = mock.patch.object(transcribe_audio, "_prepare_audio", return_value=(None, None))
+        self.prepare = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(transcribe_audio, "_get_client")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cache_hit_skips_transcription(self):
+        with mock.patch.object(transcribe_audio, "_finish", side_effect=lambda result, *args, **kwargs: result):
+            self.assertEqual(transcribe_audio.transcribe_audio("standup.mp3"), {"text": "cached"})
+        self.prepare.assert_not_called()
+
+    def test_force_bypasses_the_cache(self):
+        self.assertIsNone(transcribe_audio.transcribe_audio("standup.mp3", force=True))
+        self.load.assert_not_called()
+        self.prepare.assert_called_once_with("standup.mp3")
+
+class ChooseCutsTest(unittest.TestCase):
+
+    def test_cuts_at_last_pause_in_each_window(self):
+        self.assertEqual(transcribe_audio.choose_cuts([100, 200, 280, 450, 590], 300), [280, 450])
+
+    def test_ignores_pauses_in_first_half_of_window(self):
+        # 100 is too early to be a cut, so the window without a later pause is cut at its end
+        self.assertEqual(transcribe_audio.choose_cuts([100, 400], 300), [300])
+
+    def test_window_without_pause_is_cut_at_its_end(self):
+        cuts = transcribe_audio.choose_cuts([290, 2000], 300)
+        self.assertEqual(cuts, [290, 590, 890, 1190, 1490, 1790])
+
+    def test_tail_after_last_pause_is_bounded_by_duration(self):
+        cuts = transcribe_audio.choose_cuts([290], 300, duration=1000)
+        self.assertEqual(cuts, [290, 590, 890])
+
+    def test_no_part_exceeds_segment_seconds(self):
+        pauses = [10, 160, 900, 905, 1500, 2600, 2650]
+        duration = 4000
+        cuts = transcribe_audio.choose_cuts(pauses, 300, duration)
+        bounds = [0] + cuts + [duration]
+        self.assertTrue(all(end - start <= 300 for start, end in zip(bounds, bounds[1:])))
+
+class ProbeDurationTest(unittest.TestCase):
+
+    def setUp(self):
+        transcribe_audio._run_ffprobe.cache_clear()
+        self.addCleanup(transcribe_audio._run_ffprobe.cache_clear)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.audio_path = os.path.join(tmp.name, "standup.mp3")
+        with open(self.audio_path, "wb") as f:
+            f.write(b"audio")
+
+    def probe(self):
+        with mock.patch.object(transcribe_audio.subprocess, "run") as run:
+            run.return_value.stdout = "12.5\n"
+            return transcribe_audio.probe_duration(self.audio_path), run
+
+    def test_repeated_probe_uses_the_cache(self):
+        self.assertEqual(self.probe()[0], 12.5)
+        duration, run = self.probe()
+        self.assertEqual(duration, 12.5)
+        run.assert_not_called()
+
+    def test_changed_file_is_probed_again(self):
+        self.probe()
+        with open(self.audio_path, "ab") as f:
+            f.write(b" more audio")
+        _, run = self.probe()
+        run.assert_called_once()
+
+    def test_missing_file_has_no_duration(self):
+        self.assertIsNone(transcribe_audio.probe_duration(self.audio_path + ".missing"))
+
+class SplitAudioTest(unittest.TestCase):
+
+    def split(self, size, duration):
+        with mock.patch.object(transcribe_audio.os.path, "getsize", return_value=size), \
+                mock.patch.object(transcribe_audio, "probe_duration", return_value=duration), \
+                mock.patch.object(transcribe_audio.subprocess, "run") as run:
+            run.return_value.returncode = 1  # ffmpeg "fails", so no parts are produced
+            return transcribe_audio.split_audio("standup.mp3"), run
+
+    def test_single_part_recording_skips_ffmpeg(self):
+        parts, run = self.split(1024 * 1024, 120.0)
+        self.assertEqual(parts, ["standup.mp3"])
+        run.assert_not_called()
+
+    def test_long_recording_is_split(self):
+        _, run = self.split(1024 * 1024, 1200.0)
+        self.assertTrue(run.called)
+
+    def test_large_recording_is_split(self):
+        _, run = self.split(transcribe_audio.PART_MAX_BYTES + 1, 120.0)
+        self.assertTrue(run.called)
+
+class MergeTranscriptsTest(unittest.TestCase):
+
+    def test_offsets_segments_by_earlier_part_durations(self):
+        merged = transcribe_audio.merge_transcripts([
+            _part(" first", 10.0, [(0, 4), (4, 10)]),
+            _part("second ", 5.0, [(1, 3)])
+        ])
+
+        self.assertEqual(merged["text"], "first second")
+        self.assertEqual(merged["duration"], 15.0)
+        self.assertEqual([(s["start"], s["end"]) for s in merged["segments"]], [(0, 4), (4, 10), (11.0, 13.0)])
+
+    def test_missing_duration_falls_back_to_probe(self):
+        parts = [_part("a", 0, [(0, 1)]), _part("b", 5.0, [(1, 2)])]
+        with mock.patch.object(transcribe_audio, "probe_duration", return_value=8.0) as probe:
+            merged = transcribe_audio.merge_transcripts(parts, ["part_000.mp3", "part_001.mp3"])
+
+        probe.assert_called_once_with("part_000.mp3")
+        self.assertEqual(merged["segments"][1]["start"], 9.0)
+        self.assertEqual(merged["duration"], 13.0)
+
+    def test_failed_part_fails_the_merge(self):
+        with self.assertLogs("transcribe_audio", "ERROR"):
+            self.assertIsNone(transcribe_audio.merge_transcripts([_part("a", 1.0, []), None]))
+
+class RetryDelayTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(transcribe_audio, "_backoff", return_value=1.5)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def delay(self, error, attempt=0, max_retries=3):
+        with self.assertLogs("transcribe_audio", "ERROR"):
+            try:
+                raise error
+            except Exception as e:
+                return transcribe_audio._retry_delay(e, attempt, max_retries)
+
+    def test_retries_rate_limits_and_server_errors(self):
+        for status in (408, 429, 500, 503):
+            with self.subTest(status=status):
+                self.assertEqual(self.delay(_status_error(status)), 1.5)
+
+    def test_retries_connection_errors(self):
+        request = httpx.Request("POST", "https://api.openai.com/v1/audio/transcriptions")
+        self.assertEqual(self.delay(openai.APIConnectionError(request=request)), 1.5)
+
+    def test_gives_up_on_client_errors(self):
+        for status in (400, 401, 413):
+            with self.subTest(status=status):
+                self.assertIsNone(self.delay(_status_error(status)))
+
+    def test_gives_up_on_non_api_errors(self):
+        self.assertIsNone(self.delay(FileNotFoundError("part_000.mp3")))
+
+    def test_gives_up_after_last_attempt(self):
+        self.assertIsNone(self.delay(_status_error(500), attempt=2, max_retries=3))
+
+class CountWordsTest(unittest.TestCase):
+
+    def test_counts_runs_of_non_whitespace(self):
+        self.assertEqual(transcribe_audio.count_words(" Hello  team,\nlet's start. "), 4)
+
+    def test_blank_text_has_no_words(self):
+        self.assertEqual(transcribe_audio.count_words(""), 0)
+        self.assertEqual(transcribe_audio.count_words("   "), 0)
+
+if __name__ == "__main__":
+    unittest.main()
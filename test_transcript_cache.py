@@ -0,0 +1,57 @@
+"""
+Round-trip tests for the on-disk transcript cache
+
+Run with: python -m unittest test_transcript_cache
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import transcript_cache
+
+class TranscriptCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        patcher = mock.patch.object(transcript_cache, "CACHE_DIR", self.tmp / "cache")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, name, data):
+        path = self.tmp / name
+        path.write_bytes(data)
+        return path
+
+    def test_key_depends_on_contents_not_location(self):
+        a = self.write("a.mp3", b"same audio")
+        b = self.write("b.mp3", b"same audio")
+        c = self.write("c.mp3", b"other audio")
+
+        self.assertEqual(transcript_cache.file_key(a), transcript_cache.file_key(b))
+        self.assertNotEqual(transcript_cache.file_key(a), transcript_cache.file_key(c))
+
+    def test_store_then_load(self):
+        transcript = {"text": "hello", "language": "en", "duration": 1.5, "segments": [{"start": 0, "end": 1.5, "text": "hello"}]}
+        transcript_cache.store("abc", transcript)
+
+        with self.assertLogs("transcript_cache", "INFO"):
+            cached = transcript_cache.load("abc")
+        self.assertEqual(cached, transcript)
+        self.assertEqual(list((self.tmp / "cache").glob("*.tmp")), [])
+
+    def test_unreadable_entry_is_a_miss(self):
+        (self.tmp / "cache").mkdir()
+        (self.tmp / "cache" / "abc.json").write_bytes(b'{"text": "hel')
+
+        with self.assertLogs("transcript_cache", "WARNING"):
+            self.assertIsNone(transcript_cache.load("abc"))
+
+    def test_miss(self):
+        self.assertIsNone(transcript_cache.load("missing"))
+
+if __name__ == "__main__":
+    unittest.main()
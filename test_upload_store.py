@@ -0,0 +1,46 @@
+"""
+Tests for saving web uploads to disk
+
+Run with: python -m unittest test_upload_store
+"""
+
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import upload_store
+
+class SaveUploadedFileTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.upload_dir = tmp.name
+        patcher = mock.patch.object(upload_store, "UPLOAD_DIR", self.upload_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def upload(self, name, data):
+        uploaded_file = io.BytesIO(data)
+        uploaded_file.name = name
+        return uploaded_file
+
+    def test_copies_contents_larger_than_one_chunk(self):
+        data = bytes(range(256)) * 10_000  # ~2.5 MiB, spans several copy chunks
+        file_path = upload_store.save_uploaded_file(self.upload("standup.mp3", data))
+
+        self.assertEqual(Path(file_path), Path(self.upload_dir) / "standup.mp3")
+        self.assertEqual(Path(file_path).read_bytes(), data)
+
+    def test_rewinds_an_already_read_upload(self):
+        uploaded_file = self.upload("standup.mp3", b"audio bytes")
+        uploaded_file.read()
+
+        file_path = upload_store.save_uploaded_file(uploaded_file)
+
+        self.assertEqual(Path(file_path).read_bytes(), b"audio bytes")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,26 +1,76 @@
 import requests
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
+import json
+import time
+from pathlib import Path
+import env  # loads .env
 
 # Your credentials from Zoom Developer Portal
 ACCOUNT_ID = os.getenv("ZOOM_ACCOUNT_ID")
 CLIENT_ID = os.getenv("ZOOM_CLIENT_ID")
 CLIENT_SECRET = os.getenv("ZOOM_CLIENT_SECRET")
 
+# Tokens are valid ~1 hour; reuse them across runs until shortly before expiry
+TOKEN_CACHE_FILE = Path.home() / ".cache" / "zoom_token.json"
+TOKEN_EXPIRY_MARGIN = 60  # seconds
+_token_cache = {}  # In-process copy of the cached token
+
+# Shared session so consecutive calls reuse the TCP/TLS connection
+SESSION = requests.Session()
+
+def _load_cached_token():
+    """Return a still-valid cached token (memory first, then disk), or None"""
+    cached = _token_cache
+    
+    if not cached and TOKEN_CACHE_FILE.exists():
+        try:
+            cached = json.loads(TOKEN_CACHE_FILE.read_text())
+        except (OSError, ValueError):
+            return None
+    
+    if cached.get("account_id") == ACCOUNT_ID and time.time() < cached.get("expires_at", 0) - TOKEN_EXPIRY_MARGIN:
+        _token_cache.update(cached)
+        return cached["access_token"]
+    
+    return None
+
+def _save_cached_token(token, expires_in):
+    """Persist the token with its expiry time (readable only by the current user)"""
+    cached = {
+        "account_id": ACCOUNT_ID,
+        "access_token": token,
+        "expires_at": time.time() + expires_in
+    }
+    _token_cache.update(cached)
+    
+    try:
+        TOKEN_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(TOKEN_CACHE_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(cached, f)
+        os.chmod(TOKEN_CACHE_FILE, 0o600)
+    except OSError as e:
+        print(f"⚠️  Could not cache token: {e}")
+
 def get_zoom_token():
-    """Get Server-to-Server OAuth token"""
+    """Get Server-to-Server OAuth token (cached until shortly before it expires)"""
+    token = _load_cached_token()
+    if token:
+        print(f"✅ Using cached token: {token[:20]}...")
+        return token
+    
     url = f"https://zoom.us/oauth/token?grant_type=account_credentials&account_id={ACCOUNT_ID}"
     
-    response = requests.post(
+    response = SESSION.post(
         url,
         auth=(CLIENT_ID, CLIENT_SECRET),
         headers={"Content-Type": "application/x-www-form-urlencoded"}
     )
     
     if response.status_code == 200:
-        token = response.json()["access_token"]
+        data = response.json()
+        token = data["access_token"]
+        _save_cached_token(token, data.get("expires_in", 3600))
         print(f"✅ Token obtained: {token[:20]}...")
         return token
     else:
@@ -37,7 +87,7 @@ def list_recordings(token):
         "Content-Type": "application/json"
     }
     
-    response = requests.get(url, headers=headers)
+    response = SESSION.get(url, headers=headers)
     
     if response.status_code == 200:
         recordings = response.json()
@@ -1,265 +1,1050 @@
 """
 Transcribe audio/video file using OpenAI Whisper API with retry logic
-Converts video to audio first to reduce file size
+Compresses input to 16kHz mono Opus first to reduce upload size
 """
 
 import os
-from openai import OpenAI
-from dotenv import load_dotenv
+import asyncio
+import functools
+import itertools
+import logging
+import env
+import transcript_cache
 import json
+import mimetypes
+import random
+import re
+import threading
 import time
 from pathlib import Path
+import shutil
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-load_dotenv()
+try:
+    import orjson  # several times faster for large transcripts
+except ImportError:
+    orjson = None
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+logger = logging.getLogger(__name__)
 
-def convert_video_to_audio(video_path):
+@functools.lru_cache(maxsize=1)
+def _get_client():
     """
-    Convert video file to MP3 audio using ffmpeg
+    OpenAI client, created on first use
+    
+    Importing openai costs ~0.3s, and a client built at import would be
+    shared across forked workers (Gunicorn, Celery); this builds it in the
+    process that uses it. The pool is warmed up once, right after it is built.
+    """
+    import httpx
+    from openai import OpenAI
+    # Retries are handled by _retry_delay - don't stack the SDK's on top.
+    # HTTP/2 lets parallel part uploads share one TLS connection
+    client = OpenAI(
+        api_key=env.OPENAI_API_KEY,
+        max_retries=0,
+        http_client=httpx.Client(http2=True, limits=httpx.Limits(max_connections=16, max_keepalive_connections=16))
+    )
+    _warm_up(client)
+    return client
+
+def _new_async_client():
+    """
+    AsyncOpenAI client over an HTTP/2 pool
+    
+    Create it inside the running event loop (its pool is bound to that loop)
+    and close it when done.
+    """
+    import httpx
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(
+        api_key=env.OPENAI_API_KEY,
+        max_retries=0,
+        http_client=httpx.AsyncClient(http2=True, limits=httpx.Limits(max_connections=16, max_keepalive_connections=16))
+    )
+
+def _warm_up(client):
+    """Open a connection to the API in the background, while the audio is still being prepared"""
+    def ping():
+        try:
+            client.models.list()
+        except Exception:
+            pass  # the upload itself will report any real problem
+    
+    threading.Thread(target=ping, daemon=True).start()
+
+# Long recordings are split into parts of this length and transcribed in parallel
+CHUNK_SECONDS = 300
+MAX_PARALLEL_CHUNKS = int(os.getenv("WHISPER_CONCURRENCY", "4"))
+
+# Retry backoff: base * 2^attempt seconds, capped, plus up to 50% jitter
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+# Whisper rejects uploads above 25MB; bigger files are split into parts below
+# PART_MAX_BYTES (a little headroom for the variable bitrate around each cut)
+WHISPER_MAX_BYTES = 25 * 1024 * 1024
+PART_MAX_BYTES = 24 * 1024 * 1024
+
+# Read buffer for streaming uploads
+UPLOAD_BUFFER_BYTES = 1 << 20
+
+# Recordings at or below this size are uploaded without re-encoding, if Whisper
+# accepts their format - compressing would save less time than ffmpeg costs.
+# Whisper reads the audio track of .mp4/.webm itself, so those skip ffmpeg too
+COMPRESS_MIN_BYTES = 5 * 1024 * 1024
+WHISPER_UPLOAD_EXTENSIONS = {'.flac', '.m4a', '.mp3', '.mp4', '.mpeg', '.mpga', '.oga', '.ogg', '.wav', '.webm'}
+VIDEO_EXTENSIONS = {'.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv'}
+
+# Parts are cut in pauses so words aren't split across parts
+SILENCE_THRESHOLD = "-30dB"
+SILENCE_MIN_DURATION = 0.5  # seconds
+
+def transcript_path_for(audio_file_path):
+    """
+    Path of the transcript JSON saved for a recording
+    
+    Only the final suffix is swapped, so dots elsewhere in the path
+    (e.g. a "talks.mp3/" directory) are left alone.
+    
+    Returns:
+        Path: <dir>/<stem>_transcript.json
+    """
+    audio_path = Path(audio_file_path)
+    return audio_path.with_name(audio_path.stem + '_transcript.json')
+
+def count_words(text):
+    """
+    Word count of a transcript
+    
+    Whisper text often starts with a space and may hold doubled spaces or
+    newlines, so words are counted as runs of non-whitespace. They are
+    matched one at a time, so long transcripts aren't copied into a list.
+    """
+    return sum(1 for _ in re.finditer(r"\S+", text))
+
+def audio_fingerprint(audio_file_path):
+    """Modification time and size of a recording - change whenever it is replaced or edited"""
+    stat = os.stat(audio_file_path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+def load_saved_transcript(audio_file_path):
+    """
+    Load the transcript an earlier run saved for this recording
+    
+    Args:
+        audio_file_path: Path to the original audio/video file
+    
+    Returns:
+        dict: Saved transcript, or None if there is none or the recording
+              has changed since it was transcribed
+    """
+    transcript_file = transcript_path_for(audio_file_path)
+    if not transcript_file.exists():
+        return None
+    
+    with open(transcript_file, 'rb') as f:
+        saved = orjson.loads(f.read()) if orjson else json.load(f)
+    
+    if saved.get("source") != audio_fingerprint(audio_file_path):
+        return None
+    
+    return saved
+
+def compress_audio(input_path):
+    """
+    Re-encode audio/video to 16kHz mono Opus using ffmpeg
+    
+    Whisper resamples everything to 16kHz mono internally, so uploading
+    anything richer only costs bandwidth. This shrinks uploads ~20-50x.
     
     Args:
-        video_path: Path to video file
+        input_path: Path to audio or video file
     
     Returns:
-        str: Path to converted audio file, or None if conversion fails
+        str: Path to compressed audio file, or None if conversion fails
     """
-    print("🎬 Video file detected - extracting audio...")
+    logger.info("🗜️  Compressing audio to 16kHz mono Opus...")
     
     # Check if ffmpeg is available
     try:
         subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
     except (subprocess.CalledProcessError, FileNotFoundError):
-        print("❌ Error: ffmpeg not found!")
-        print("   Please install ffmpeg:")
-        print("   - Mac: brew install ffmpeg")
-        print("   - Ubuntu: sudo apt-get install ffmpeg")
-        print("   - Windows: Download from https://ffmpeg.org/download.html")
+        logger.error(
+            "❌ Error: ffmpeg not found!\n"
+            "   Please install ffmpeg:\n"
+            "   - Mac: brew install ffmpeg\n"
+            "   - Ubuntu: sudo apt-get install ffmpeg\n"
+            "   - Windows: Download from https://ffmpeg.org/download.html"
+        )
         return None
     
-    # Create temporary audio file
-    video_name = Path(video_path).stem
-    temp_audio = f"{video_name}_audio.mp3"
+    # Unique temp file (.ogg - Whisper doesn't accept the .opus extension), so
+    # concurrent jobs on recordings with the same name don't overwrite each other
+    fd, temp_audio = tempfile.mkstemp(prefix=f"{Path(input_path).stem}_", suffix=".ogg")
+    os.close(fd)
     
     try:
-        print(f"   Converting {Path(video_path).name} to MP3...")
+        logger.info(f"   Converting {Path(input_path).name} to Opus...")
         
-        # Extract audio with compression
-        # -vn: no video, -acodec: audio codec, -ar: audio sample rate, -ab: audio bitrate
+        # -vn: no video, -ac: channels, -ar: audio sample rate, -b:a: audio bitrate
         result = subprocess.run([
             'ffmpeg',
-            '-i', video_path,
+            '-i', input_path,
             '-vn',  # No video
-            '-acodec', 'libmp3lame',  # MP3 codec
+            '-ac', '1',  # Mono
             '-ar', '16000',  # 16kHz sample rate (Whisper optimal)
-            '-ab', '32k',  # 32kbps bitrate (good quality, small size)
+            '-c:a', 'libopus',  # Opus codec
+            '-b:a', '24k',  # 24kbps bitrate (plenty for speech)
             '-y',  # Overwrite output file
             temp_audio
         ], capture_output=True, text=True)
         
         if result.returncode != 0:
-            print(f"❌ ffmpeg error: {result.stderr}")
+            logger.error(f"❌ ffmpeg error: {result.stderr}")
+            os.remove(temp_audio)
             return None
         
         # Check output file size
         audio_size_mb = os.path.getsize(temp_audio) / (1024 * 1024)
-        print(f"✅ Audio extracted: {audio_size_mb:.1f}MB")
+        logger.info(f"✅ Audio compressed: {audio_size_mb:.1f}MB")
         
-        if audio_size_mb > 25:
-            print(f"⚠️  Warning: Extracted audio is still {audio_size_mb:.1f}MB")
-            print("   This exceeds Whisper's 25MB limit.")
-            print("   Try recording shorter meetings or use lower quality settings.")
-            return None
+        if os.path.getsize(temp_audio) > WHISPER_MAX_BYTES:
+            logger.info("   Still above Whisper's 25MB limit - it will be uploaded in parts")
         
         return temp_audio
         
     except Exception as e:
-        print(f"❌ Conversion error: {e}")
+        logger.error(f"❌ Conversion error: {e}")
+        if os.path.exists(temp_audio):
+            os.remove(temp_audio)
         return None
 
-def transcribe_audio(audio_file_path, max_retries=3):
+def probe_duration(audio_path):
     """
-    Transcribe audio/video using OpenAI Whisper API with retry logic
+    Duration of an audio/video file in seconds, read from the container by ffprobe
+    
+    Returns:
+        float: Duration, or None if ffprobe is missing or can't read the file
+    """
+    try:
+        stat = os.stat(audio_path)
+    except OSError:
+        return None
+    
+    return _run_ffprobe(os.path.abspath(audio_path), stat.st_mtime_ns, stat.st_size)
+
+# Keyed by (path, mtime, size), so retries and repeated passes over the same
+# file don't re-run ffprobe, and a replaced file is probed again. Bounded so a
+# long-running app doesn't keep an entry for every recording it has seen.
+@functools.lru_cache(maxsize=256)
+def _run_ffprobe(audio_path, mtime_ns, size):
+    """Ask ffprobe for the container duration (see probe_duration)"""
+    try:
+        result = subprocess.run([
+            'ffprobe',
+            '-v', 'error',
+            '-show_entries', 'format=duration',
+            '-of', 'default=noprint_wrappers=1:nokey=1',
+            audio_path
+        ], capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+def find_silence_cuts(audio_path, segment_seconds=CHUNK_SECONDS):
+    """
+    Pick cut points in pauses, roughly every `segment_seconds`
+    
+    Uses ffmpeg's silencedetect filter. Each cut is the last pause in the
+    second half of its window; if a window has no pause, it is cut at the
+    window's end, so no part is ever longer than `segment_seconds`.
     
     Args:
-        audio_file_path: Path to audio or video file
+        audio_path: Path to audio file
+        segment_seconds: Target part length in seconds
+    
+    Returns:
+        list: Cut times in seconds (empty if no pauses were found)
+    """
+    try:
+        result = subprocess.run([
+            'ffmpeg',
+            '-i', audio_path,
+            '-af', f'silencedetect=n={SILENCE_THRESHOLD}:d={SILENCE_MIN_DURATION}',
+            '-f', 'null', '-'
+        ], capture_output=True, text=True)
+    except FileNotFoundError:
+        return []
+    
+    if result.returncode != 0:
+        return []
+    
+    # Cut in the middle of each pause
+    starts = [float(t) for t in re.findall(r"silence_start: ([\d.]+)", result.stderr)]
+    ends = [float(t) for t in re.findall(r"silence_end: ([\d.]+)", result.stderr)]
+    pauses = [(start + end) / 2 for start, end in zip(starts, ends)]
+    if not pauses:
+        return []
+    
+    return choose_cuts(pauses, segment_seconds, probe_duration(audio_path))
+
+def choose_cuts(pauses, segment_seconds, duration=None):
+    """
+    Pick cut times from pause times (see find_silence_cuts)
+    
+    Args:
+        pauses: Pause midpoints in seconds, ascending
+        segment_seconds: Maximum part length in seconds
+        duration: Total length in seconds, so the tail after the last
+                  pause is bounded too (None if unknown)
+    
+    Returns:
+        list: Cut times in seconds
+    """
+    cuts = []
+    last_cut = 0
+    candidate = None
+    
+    def close_window():
+        nonlocal last_cut, candidate
+        # Cut at the window's last pause, or at its end if it had none
+        last_cut = candidate if candidate is not None else last_cut + segment_seconds
+        cuts.append(last_cut)
+        candidate = None
+    
+    for pause in pauses:
+        while pause - last_cut > segment_seconds:
+            close_window()
+        if pause - last_cut >= segment_seconds / 2:
+            candidate = pause
+    
+    while duration and duration - last_cut > segment_seconds:
+        close_window()
+    
+    return cuts
+
+def split_audio(audio_path, segment_seconds=CHUNK_SECONDS):
+    """
+    Split audio into parts of about `segment_seconds` using ffmpeg's segment muxer
+    
+    Cuts are placed in pauses when ffmpeg can find them, otherwise at fixed
+    intervals. Parts are stream-copied (no re-encode), so splitting is nearly free.
+    Files above PART_MAX_BYTES get shorter parts, sized from their average
+    bitrate, so every part fits under Whisper's upload limit.
+    
+    Args:
+        audio_path: Path to audio file
+        segment_seconds: Length of each part in seconds
+    
+    Returns:
+        list: Paths of the parts in order, or [audio_path] if the audio
+              is a single part or splitting fails
+    """
+    size = os.path.getsize(audio_path)
+    duration = probe_duration(audio_path)
+    if size <= PART_MAX_BYTES:
+        # Already a single uploadable part - skip the silencedetect decode and the mux
+        if duration is not None and duration <= segment_seconds:
+            return [audio_path]
+    elif duration:
+        segment_seconds = min(segment_seconds, max(int(duration * PART_MAX_BYTES / size), 1))
+    
+    cuts = find_silence_cuts(audio_path, segment_seconds)
+    if cuts:
+        split_args = ['-segment_times', ','.join(f"{cut:.3f}" for cut in cuts)]
+    else:
+        split_args = ['-segment_time', str(segment_seconds)]
+    
+    parts_dir = tempfile.mkdtemp(prefix=f"{Path(audio_path).stem}_parts_")
+    pattern = os.path.join(parts_dir, f"part_%03d{Path(audio_path).suffix}")
+    
+    try:
+        result = subprocess.run([
+            'ffmpeg',
+            '-i', audio_path,
+            '-f', 'segment',
+            *split_args,
+            '-reset_timestamps', '1',
+            '-c', 'copy',  # No re-encode
+            '-y',
+            pattern
+        ], capture_output=True, text=True)
+    except FileNotFoundError:
+        result = None
+    
+    parts = sorted(str(p) for p in Path(parts_dir).iterdir())
+    
+    if result is None or result.returncode != 0 or len(parts) <= 1:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        return [audio_path]
+    
+    how = "at pauses" if cuts else "at fixed intervals"
+    logger.info(f"✂️  Split audio into {len(parts)} parts of ~{segment_seconds / 60:.1f} minutes ({how})")
+    return parts
+
+def _to_result(transcript):
+    """
+    Convert a verbose_json Whisper response into our transcript dict
+    
+    Returns:
+        dict: Transcript with text, language, duration and segments, or None
+              if the response holds no text
+    """
+    if hasattr(transcript, 'text'):
+        transcript_text = transcript.text
+        duration = getattr(transcript, 'duration', 0)
+    elif isinstance(transcript, dict):
+        transcript_text = transcript.get('text', '')
+        duration = transcript.get('duration', 0)
+    else:
+        transcript_text = str(transcript)
+        duration = 0
+    
+    if not transcript_text:
+        return None
+    
+    # Extract data
+    result = {
+        "text": transcript_text,
+        "language": getattr(transcript, 'language', 'en'),
+        "duration": duration
+    }
+    
+    # Add segments if available. A response holds either SDK objects or plain
+    # dicts throughout, so check the type once rather than per segment
+    if isinstance(transcript, dict):
+        segments = transcript.get('segments') or []
+    else:
+        segments = getattr(transcript, 'segments', None) or []
+    
+    if segments and isinstance(segments[0], dict):
+        result["segments"] = [
+            {"start": segment['start'], "end": segment['end'], "text": segment['text']}
+            for segment in segments
+        ]
+    else:
+        result["segments"] = [
+            {"start": segment.start, "end": segment.end, "text": segment.text}
+            for segment in segments
+        ]
+    
+    return result
+
+def _backoff(attempt):
+    """Exponential backoff with jitter, so parallel parts don't all retry at the same instant"""
+    return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt) * (1 + random.random() * 0.5)
+
+def _retry_delay(error, attempt, max_retries):
+    """
+    Decide how to handle a failed Whisper call
+    
+    Server errors (5xx), rate limits (429), timeouts and connection errors
+    are retried; other client errors (4xx) and non-API failures are not.
+    
+    Args:
+        error: The exception raised by the API call
+        attempt: Zero-based attempt number
         max_retries: Maximum number of retry attempts
     
     Returns:
-        dict: Transcript with text and segments
+        Seconds to wait before the next attempt, or None to give up
     """
+    import openai  # already loaded by the client that raised
     
-    print(f"🎙️  Transcribing: {audio_file_path}")
+    logger.error(f"❌ Error during transcription (attempt {attempt + 1}/{max_retries}): {error}")
     
-    # Get file extension
-    ext = Path(audio_file_path).suffix.lower()
-    video_extensions = ['.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv']
-    
-    # Convert video to audio if needed
-    temp_audio_file = None
-    if ext in video_extensions:
-        temp_audio_file = convert_video_to_audio(audio_file_path)
-        if not temp_audio_file:
-            print("❌ Failed to convert video to audio")
+    if isinstance(error, openai.APIStatusError):
+        status = error.status_code
+        if status == 413:
+            logger.error("   File is too large for Whisper API (max 25MB).")
             return None
-        audio_file_path = temp_audio_file
-        print(f"✅ Using converted audio: {audio_file_path}")
+        if status < 500 and status not in (408, 429):
+            logger.error(f"   Request rejected ({status}) - not retrying.")
+            return None
+    elif not isinstance(error, openai.APIConnectionError):
+        # Not an API failure (e.g. unreadable file) - retrying won't help
+        logger.exception("   Unexpected error - not retrying")
+        return None
     
-    print("⏳ This may take a minute...")
+    if attempt == max_retries - 1:
+        logger.error("💥 All retry attempts failed!")
+        return None
     
-    # Check file size (Whisper has 25MB limit)
-    file_size_mb = os.path.getsize(audio_file_path) / (1024 * 1024)
-    print(f"📦 File size: {file_size_mb:.1f}MB")
+    wait_time = _backoff(attempt)
+    logger.info(f"   Retrying in {wait_time:.1f} seconds...")
+    return wait_time
+
+def _transcribe_file(audio_file_path, max_retries=3):
+    """
+    Send a single audio file to Whisper with retry logic
     
-    if file_size_mb > 25:
-        print(f"❌ Error: File is {file_size_mb:.1f}MB. Whisper API limit is 25MB.")
-        print("   Try compressing the file or recording shorter segments.")
-        if temp_audio_file and os.path.exists(temp_audio_file):
-            os.remove(temp_audio_file)
-        return None
+    Args:
+        audio_file_path: Path to audio file (must be under the 25MB limit)
+        max_retries: Maximum number of retry attempts
+    
+    Returns:
+        dict: Transcript with text, language, duration and segments, or None
+    """
+    mime_type = mimetypes.guess_type(audio_file_path)[0] or "application/octet-stream"
     
-    result = None
     for attempt in range(max_retries):
         try:
-            # Open file
-            with open(audio_file_path, "rb") as audio_file:
-                print(f"   Attempt {attempt + 1}/{max_retries}...")
+            # Open file (1 MiB buffer - far fewer read syscalls while streaming)
+            with open(audio_file_path, "rb", buffering=UPLOAD_BUFFER_BYTES) as audio_file:
+                logger.info(f"   Attempt {attempt + 1}/{max_retries}...")
                 
-                # Call Whisper API
-                transcript = client.audio.transcriptions.create(
+                # Call Whisper API. Passing an open handle in a (name, file, type)
+                # tuple lets httpx stream the multipart body in chunks instead
+                # of the SDK reading the whole file into memory first
+                transcript = _get_client().audio.transcriptions.create(
                     model="whisper-1",
-                    file=audio_file,
+                    file=(Path(audio_file_path).name, audio_file, mime_type),
                     response_format="verbose_json"  # Get more details
                 )
-            
-            print("✅ Transcription complete!")
-            
-            # Handle response
-            if hasattr(transcript, 'text'):
-                transcript_text = transcript.text
-                duration = getattr(transcript, 'duration', 0)
-            elif isinstance(transcript, dict):
-                transcript_text = transcript.get('text', '')
-                duration = transcript.get('duration', 0)
-            else:
-                transcript_text = str(transcript)
-                duration = 0
-            
-            if not transcript_text:
-                print("⚠️  Warning: Empty transcript received")
-                if attempt < max_retries - 1:
-                    print(f"   Retrying in {2 ** attempt} seconds...")
-                    time.sleep(2 ** attempt)
-                    continue
+        except Exception as e:
+            wait_time = _retry_delay(e, attempt, max_retries)
+            if wait_time is None:
                 break
-            
-            # Extract data
-            result = {
-                "text": transcript_text,
-                "language": getattr(transcript, 'language', 'en'),
-                "duration": duration,
-                "segments": []
-            }
-            
-            # Try to add segments if available
-            if hasattr(transcript, 'segments'):
-                for segment in transcript.segments:
-                    if isinstance(segment, dict):
-                        result["segments"].append({
-                            "start": segment.get('start', 0),
-                            "end": segment.get('end', 0),
-                            "text": segment.get('text', '')
-                        })
-                    elif hasattr(segment, 'start'):
-                        result["segments"].append({
-                            "start": segment.start,
-                            "end": segment.end,
-                            "text": segment.text
-                        })
-            
-            # If no segments, create one for the whole text
-            if not result["segments"]:
-                result["segments"].append({
-                    "start": 0,
-                    "end": duration,
-                    "text": transcript_text
-                })
-            
-            # Print summary
-            print(f"\n📊 Summary:")
-            if duration > 0:
-                print(f"   Duration: {duration:.1f} seconds ({duration/60:.1f} minutes)")
-            print(f"   Word count: ~{len(result['text'].split())} words")
-            print(f"\n📝 First 200 characters:")
-            print(f"   {result['text'][:200]}...")
-            
-            break  # Success, exit retry loop
-            
+            time.sleep(wait_time)
+            continue
+        
+        logger.info("✅ Transcription complete!")
+        
+        result = _to_result(transcript)
+        if result:
+            return result
+        
+        logger.warning("⚠️  Warning: Empty transcript received")
+        if attempt < max_retries - 1:
+            wait_time = _backoff(attempt)
+            logger.info(f"   Retrying in {wait_time:.1f} seconds...")
+            time.sleep(wait_time)
+    
+    return None
+
+async def _transcribe_file_async(audio_file_path, aclient, max_retries=3):
+    """Async counterpart of _transcribe_file - same retry ladder, sleeping without blocking the event loop"""
+    mime_type = mimetypes.guess_type(audio_file_path)[0] or "application/octet-stream"
+    
+    # Read in a worker thread: a sync file handle would make httpx do blocking
+    # disk reads on the event loop, stalling every other upload. Callers hold
+    # a semaphore slot around this, so only that many parts sit in memory
+    try:
+        audio_bytes = await asyncio.to_thread(Path(audio_file_path).read_bytes)
+    except OSError:
+        logger.exception(f"❌ Could not read {audio_file_path}")
+        return None
+    
+    for attempt in range(max_retries):
+        try:
+            logger.info(f"   Attempt {attempt + 1}/{max_retries}: {Path(audio_file_path).name}...")
+            transcript = await aclient.audio.transcriptions.create(
+                model="whisper-1",
+                file=(Path(audio_file_path).name, audio_bytes, mime_type),
+                response_format="verbose_json"
+            )
         except Exception as e:
-            error_msg = str(e)
-            print(f"❌ Error during transcription (attempt {attempt + 1}/{max_retries}): {error_msg}")
-            
-            # Check error type
-            if "500" in error_msg or "503" in error_msg:
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt
-                    print(f"   OpenAI server error. Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                    continue
-            elif "429" in error_msg:
-                if attempt < max_retries - 1:
-                    wait_time = 5 * (attempt + 1)
-                    print(f"   Rate limit hit. Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                    continue
-            elif "413" in error_msg or "file too large" in error_msg.lower():
-                print("   File is too large for Whisper API (max 25MB).")
+            wait_time = _retry_delay(e, attempt, max_retries)
+            if wait_time is None:
                 break
-            
-            if attempt == max_retries - 1:
-                print("\n💥 All retry attempts failed!")
-                import traceback
-                traceback.print_exc()
+            await asyncio.sleep(wait_time)
+            continue
+        
+        logger.info(f"✅ Transcription complete: {Path(audio_file_path).name}")
+        
+        result = _to_result(transcript)
+        if result:
+            return result
+        
+        logger.warning("⚠️  Warning: Empty transcript received")
+        if attempt < max_retries - 1:
+            wait_time = _backoff(attempt)
+            logger.info(f"   Retrying in {wait_time:.1f} seconds...")
+            await asyncio.sleep(wait_time)
+    
+    return None
+
+def merge_transcripts(part_results, part_paths=None):
+    """
+    Stitch transcripts of consecutive audio parts into one
+    
+    Each part's segment timestamps are shifted by the total duration of the
+    parts before it.
+    
+    Args:
+        part_results: List of per-part transcript dicts, in order
+        part_paths: The parts' audio files, used to probe the duration of
+                    any part Whisper reported none for (same source as the
+                    offsets stream_transcript uses)
+    
+    Returns:
+        dict: Combined transcript, or None if any part failed
+    """
+    if not all(part_results):
+        logger.error("❌ One or more audio parts failed to transcribe")
+        return None
+    
+    result = {
+        "text": " ".join(part["text"].strip() for part in part_results),
+        "language": part_results[0]["language"],
+        "duration": 0,
+        "segments": []
+    }
+    
+    for i, part in enumerate(part_results):
+        offset = result["duration"]
+        for segment in part["segments"]:
+            result["segments"].append({
+                "start": segment["start"] + offset,
+                "end": segment["end"] + offset,
+                "text": segment["text"]
+            })
+        duration = part["duration"]
+        if not duration and part_paths:
+            duration = probe_duration(part_paths[i]) or 0
+        result["duration"] += duration
+    
+    return result
+
+def _prepare_audio(audio_file_path):
+    """
+    Compress a recording for upload (formats Whisper rejects always, others above COMPRESS_MIN_BYTES)
+    
+    Returns:
+        tuple: (path to upload or None on failure, temporary file to delete or None)
+    """
+    # Get file extension
+    ext = Path(audio_file_path).suffix.lower()
+    
+    # Small files Whisper accepts as-is upload faster than an ffmpeg pass takes
+    if ext in WHISPER_UPLOAD_EXTENSIONS and os.path.getsize(audio_file_path) <= COMPRESS_MIN_BYTES:
+        logger.info("⏳ This may take a minute...")
+        return audio_file_path, None
+    
+    # Compress to 16kHz mono before upload (required for video, a big win for audio)
+    temp_audio_file = compress_audio(audio_file_path)
+    if temp_audio_file:
+        audio_file_path = temp_audio_file
+        logger.info(f"✅ Using compressed audio: {audio_file_path}")
+    elif ext in VIDEO_EXTENSIONS:
+        logger.error("❌ Failed to convert video to audio")
+        return None, None
+    else:
+        logger.warning("⚠️  Compression failed - uploading original audio")
+    
+    logger.info("⏳ This may take a minute...")
+    
+    file_size_mb = os.path.getsize(audio_file_path) / (1024 * 1024)
+    logger.info(f"📦 File size: {file_size_mb:.1f}MB")
+    
+    return audio_file_path, temp_audio_file
+
+def _split_for_upload(upload_path, temp_audio_file):
+    """
+    Split audio into parts Whisper will accept (each under 25MB)
+    
+    Returns:
+        list: Part paths in order, or None if some part would still be too
+              large (e.g. ffmpeg is missing and the file is over 25MB)
+    """
+    parts = split_audio(upload_path)
+    
+    too_large = [part for part in parts if os.path.getsize(part) > WHISPER_MAX_BYTES]
+    if too_large:
+        logger.error(
+            f"❌ Error: {Path(too_large[0]).name} is {os.path.getsize(too_large[0]) / (1024 * 1024):.1f}MB. Whisper API limit is 25MB.\n"
+            "   Install ffmpeg so long recordings can be split automatically."
+        )
+        _cleanup_parts(parts)
+        _remove_temp(temp_audio_file)
+        return None
+    
+    return parts
+
+def _cleanup_parts(parts):
+    """Delete the temporary directory holding split parts (if the audio was split)"""
+    if len(parts) > 1:
+        shutil.rmtree(Path(parts[0]).parent, ignore_errors=True)
+
+def _remove_temp(temp_audio_file):
+    """Delete the compressed copy of a recording, if one was made"""
+    if temp_audio_file and os.path.exists(temp_audio_file):
+        os.remove(temp_audio_file)
+
+def _finish(result, source_path, temp_audio_file, save, cache_key=None):
+    """Save, cache and summarize a finished transcript, then remove the temporary audio"""
+    
+    # The API doesn't always report a duration, so fall back to the file itself
+    if result and not result.get('duration'):
+        result['duration'] = probe_duration(source_path) or 0
+    
+    if result and cache_key:
+        transcript_cache.store(cache_key, result)
+    
+    if result and save:
+        output_file = transcript_path_for(source_path)
+        # Record which version of the recording this is, so reruns can reuse it
+        saved = {**result, "source": audio_fingerprint(source_path)}
+        if orjson:
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(saved, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_file, 'w') as f:
+                json.dump(saved, f, indent=2)
+        logger.info(f"💾 Saved transcript to: {output_file}")
+    
+    # Log summary (one record, so it stays together under concurrent jobs)
+    if result:
+        duration = result['duration']
+        summary = ["📊 Summary:"]
+        if duration > 0:
+            summary.append(f"   Duration: {duration:.1f} seconds ({duration/60:.1f} minutes)")
+        summary.append(f"   Word count: ~{count_words(result['text'])} words")
+        summary.append("📝 First 200 characters:")
+        summary.append(f"   {result['text'][:200]}...")
+        logger.info("\n".join(summary))
     
     # Clean up temporary audio file
     if temp_audio_file and os.path.exists(temp_audio_file):
         try:
             os.remove(temp_audio_file)
-            print(f"🧹 Cleaned up temporary file: {temp_audio_file}")
+            logger.info(f"🧹 Cleaned up temporary file: {temp_audio_file}")
         except:
             pass
     
     return result
 
+def transcribe_audio(audio_file_path, max_retries=3, on_part=None, save=True, force=False):
+    """
+    Transcribe audio/video using OpenAI Whisper API with retry logic
+    
+    Long recordings are split into parts that are transcribed in parallel
+    and stitched back together with their timestamps offset.
+    
+    Args:
+        audio_file_path: Path to audio or video file
+        max_retries: Maximum number of retry attempts
+        on_part: Optional callback(part_index, part_transcript) invoked as
+                 each part finishes, so callers can show partial results
+        save: Write the transcript to <name>_transcript.json next to the
+              recording (reusable via load_saved_transcript). Pass False
+              when the caller keeps it in memory.
+        force: Call Whisper even if this exact recording (same bytes) is
+               in the transcript cache
+    
+    Returns:
+        dict: Transcript with text and segments
+    """
+    
+    logger.info(f"🎙️  Transcribing: {audio_file_path}")
+    
+    cache_key = transcript_cache.file_key(audio_file_path)
+    cached = None if force else transcript_cache.load(cache_key)
+    if cached:
+        if on_part:
+            on_part(0, cached)
+        return _finish(cached, audio_file_path, None, save)
+    
+    # Build the client here, before any worker threads race to create their
+    # own - on first use its warm-up overlaps the ffmpeg pass below
+    _get_client()
+    
+    upload_path, temp_audio_file = _prepare_audio(audio_file_path)
+    if not upload_path:
+        return None
+    
+    parts = _split_for_upload(upload_path, temp_audio_file)
+    if not parts:
+        return None
+    
+    try:
+        if len(parts) == 1:
+            result = _transcribe_file(parts[0], max_retries)
+            if result and on_part:
+                on_part(0, result)
+        else:
+            # Whisper calls are network-bound, so threads give real parallelism
+            part_results = [None] * len(parts)
+            with ThreadPoolExecutor(max_workers=MAX_PARALLEL_CHUNKS) as pool:
+                futures = {pool.submit(_transcribe_file, part, max_retries): i for i, part in enumerate(parts)}
+                for future in as_completed(futures):
+                    i = futures[future]
+                    part_results[i] = future.result()
+                    if part_results[i] and on_part:
+                        on_part(i, part_results[i])
+            result = merge_transcripts(part_results, parts)
+    except BaseException:
+        # _finish won't run, so drop the compressed copy here
+        _remove_temp(temp_audio_file)
+        raise
+    finally:
+        _cleanup_parts(parts)
+    
+    return _finish(result, audio_file_path, temp_audio_file, save, cache_key)
+
+async def transcribe_audio_async(audio_file_path, max_retries=3, save=True, force=False, aclient=None, sem=None):
+    """
+    Async version of transcribe_audio, for transcribing several recordings at once
+    
+    ffmpeg work and file I/O run on worker threads so the event loop only
+    waits on the Whisper calls.
+    
+    Args:
+        audio_file_path: Path to audio or video file
+        max_retries: Maximum number of retry attempts
+        save: Write the transcript next to the recording (see transcribe_audio)
+        force: Bypass the transcript cache (see transcribe_audio)
+        aclient: AsyncOpenAI client to use (one is created for this call if omitted)
+        sem: Semaphore bounding concurrent Whisper calls, shared across files
+    
+    Returns:
+        dict: Transcript with text and segments
+    """
+    
+    logger.info(f"🎙️  Transcribing: {audio_file_path}")
+    
+    cache_key = await asyncio.to_thread(transcript_cache.file_key, audio_file_path)
+    cached = None if force else await asyncio.to_thread(transcript_cache.load, cache_key)
+    if cached:
+        return await asyncio.to_thread(_finish, cached, audio_file_path, None, save)
+    
+    upload_path, temp_audio_file = await asyncio.to_thread(_prepare_audio, audio_file_path)
+    if not upload_path:
+        return None
+    
+    sem = sem or asyncio.Semaphore(MAX_PARALLEL_CHUNKS)
+    
+    async def transcribe_part(part):
+        async with sem:
+            return await _transcribe_file_async(part, aclient, max_retries)
+    
+    parts = await asyncio.to_thread(_split_for_upload, upload_path, temp_audio_file)
+    if not parts:
+        return None
+    
+    own_client = aclient is None
+    if own_client:
+        aclient = _new_async_client()
+    
+    try:
+        part_results = await asyncio.gather(*(transcribe_part(part) for part in parts))
+    except BaseException:
+        # Failed or cancelled - _finish won't run, so drop the compressed copy here
+        _remove_temp(temp_audio_file)
+        raise
+    finally:
+        _cleanup_parts(parts)
+        if own_client:
+            await aclient.close()
+    
+    result = part_results[0] if len(parts) == 1 else await asyncio.to_thread(merge_transcripts, part_results, parts)
+    return await asyncio.to_thread(_finish, result, audio_file_path, temp_audio_file, save, cache_key)
+
+async def _transcribe_many(audio_file_paths, concurrency, save, force):
+    """Run transcribe_audio_async over all files with one shared client and semaphore"""
+    
+    # One pool for every file, so uploads reuse connections across recordings
+    aclient = _new_async_client()
+    sem = asyncio.Semaphore(concurrency)
+    
+    try:
+        results = await asyncio.gather(
+            *(transcribe_audio_async(path, save=save, force=force, aclient=aclient, sem=sem) for path in audio_file_paths),
+            return_exceptions=True
+        )
+    finally:
+        await aclient.close()
+    
+    transcripts = {}
+    for path, result in zip(audio_file_paths, results):
+        if isinstance(result, Exception):
+            logger.error(f"❌ Transcription of {path} failed: {result}")
+            result = None
+        transcripts[path] = result
+    
+    return transcripts
+
+def transcribe_many(audio_file_paths, concurrency=8, save=True, force=False):
+    """
+    Transcribe several recordings concurrently
+    
+    Every Whisper call - across all files and their parts - shares one async
+    client, with at most `concurrency` requests in flight. Total time tends
+    towards the longest recording instead of the sum of all of them.
+    
+    Args:
+        audio_file_paths: Paths to audio or video files
+        concurrency: Maximum concurrent Whisper requests
+        save: Write each transcript next to its recording
+        force: Bypass the transcript cache
+    
+    Returns:
+        dict: path -> transcript (None for recordings that failed)
+    """
+    return asyncio.run(_transcribe_many(list(audio_file_paths), concurrency, save, force))
+
+async def stream_transcript(audio_file_path, max_retries=3, force=False, aclient=None, sem=None):
+    """
+    Transcribe a recording, yielding each part as soon as Whisper returns it
+    
+    Parts arrive in completion order, not transcript order. Segment times
+    are already offset to the full recording (part starts are probed with
+    ffprobe), so parts can be used as they come without waiting for the rest.
+    
+    Args:
+        audio_file_path: Path to audio or video file
+        max_retries: Maximum number of retry attempts per part
+        force: Bypass the transcript cache
+        aclient: AsyncOpenAI client to use (one is created for this call if omitted)
+        sem: Semaphore bounding concurrent Whisper calls
+    
+    Yields:
+        dict: {"chunk_index", "start", "text", "segments"} for each part, or
+              {"chunk_index", "start", "error"} for a part that failed, so
+              consumers can tell a gap from a part still in flight
+    """
+    cache_key = await asyncio.to_thread(transcript_cache.file_key, audio_file_path)
+    cached = None if force else await asyncio.to_thread(transcript_cache.load, cache_key)
+    if cached:
+        yield {"chunk_index": 0, "start": 0, "text": cached["text"], "segments": cached["segments"]}
+        return
+    
+    upload_path, temp_audio_file = await asyncio.to_thread(_prepare_audio, audio_file_path)
+    if not upload_path:
+        return
+    
+    parts = await asyncio.to_thread(_split_for_upload, upload_path, temp_audio_file)
+    if not parts:
+        return
+    
+    own_client = aclient is None
+    if own_client:
+        aclient = _new_async_client()
+    sem = sem or asyncio.Semaphore(MAX_PARALLEL_CHUNKS)
+    
+    async def transcribe_part(i, part):
+        async with sem:
+            return i, await _transcribe_file_async(part, aclient, max_retries)
+    
+    tasks = []
+    try:
+        # Absolute start of each part, so segments can be offset before the earlier parts finish
+        durations = [0] if len(parts) == 1 else await asyncio.to_thread(lambda: [probe_duration(part) or 0 for part in parts])
+        starts = list(itertools.accumulate([0] + durations[:-1]))
+        
+        tasks = [asyncio.create_task(transcribe_part(i, part)) for i, part in enumerate(parts)]
+        part_results = [None] * len(parts)
+        
+        for next_part in asyncio.as_completed(tasks):
+            i, result = await next_part
+            if not result:
+                logger.error(f"❌ Part {i + 1}/{len(parts)} failed to transcribe")
+                yield {"chunk_index": i, "start": starts[i], "error": "transcription failed"}
+                continue
+            
+            part_results[i] = result
+            yield {
+                "chunk_index": i,
+                "start": starts[i],
+                "text": result["text"],
+                "segments": [
+                    {"start": seg["start"] + starts[i], "end": seg["end"] + starts[i], "text": seg["text"]}
+                    for seg in result["segments"]
+                ]
+            }
+        
+        # Cache the whole transcript once every part made it
+        if all(part_results):
+            merged = part_results[0] if len(parts) == 1 else await asyncio.to_thread(merge_transcripts, part_results, parts)
+            await asyncio.to_thread(transcript_cache.store, cache_key, merged)
+    finally:
+        # Also runs when the consumer stops early - don't leave calls running
+        for task in tasks:
+            task.cancel()
+        _cleanup_parts(parts)
+        _remove_temp(temp_audio_file)
+        if own_client:
+            await aclient.close()
+
+async def stream_to_jsonl(audio_file_path, force=False):
+    """
+    Write each part of a transcript to <name>_transcript.jsonl as it completes
+    
+    One JSON object per line (see stream_transcript), flushed immediately, so
+    other processes can tail the file while transcription is still running.
+    
+    Failed parts are written as error records (see stream_transcript).
+    
+    Returns:
+        tuple: (output Path, number of parts written, number of parts failed)
+    """
+    output_file = transcript_path_for(audio_file_path).with_suffix('.jsonl')
+    written = failed = 0
+    
+    with open(output_file, 'wb') as f:
+        async for chunk in stream_transcript(audio_file_path, force=force):
+            line = orjson.dumps(chunk) if orjson else json.dumps(chunk).encode()
+            f.write(line + b"\n")
+            f.flush()
+            if "error" in chunk:
+                failed += 1
+                continue
+            written += 1
+            logger.info(f"📝 Part {chunk['chunk_index'] + 1} written ({len(chunk['segments'])} segments)")
+    
+    return output_file, written, failed
+
 if __name__ == "__main__":
     import sys
+    import argparse
     
-    if len(sys.argv) > 1:
-        audio_file = sys.argv[1]
-    else:
-        audio_file = "test_meeting.mp3"
+    parser = argparse.ArgumentParser(description="Transcribe recordings with Whisper")
+    parser.add_argument("files", nargs="*", default=["test_meeting.mp3"], help="Audio or video files")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write parts to <name>_transcript.jsonl as they complete")
+    parser.add_argument("--force", action="store_true", help="Ignore the transcript cache")
+    args = parser.parse_args()
+    
+    # Show progress the way the CLI always has: plain lines on stdout
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    
+    if args.stream:
+        failed = 0
+        for audio_file in args.files:
+            output_file, written, failed_parts = asyncio.run(stream_to_jsonl(audio_file, force=args.force))
+            print(f"💾 Streamed {written} part(s) to: {output_file}")
+            if failed_parts:
+                print(f"❌ {failed_parts} part(s) failed - see the error records in {output_file}")
+            # Nothing written means the recording couldn't be prepared at all
+            failed += bool(failed_parts) or written == 0
+        sys.exit(1 if failed else 0)
+    
+    if len(args.files) > 1:
+        # Several recordings: transcribe them all concurrently
+        transcripts = transcribe_many(args.files, force=args.force)
+        done = sum(1 for transcript in transcripts.values() if transcript)
+        print(f"\n✅ Transcribed {done}/{len(transcripts)} recordings")
+        sys.exit(0 if done == len(transcripts) else 1)
+    
+    audio_file = args.files[0]
     
     if not os.path.exists(audio_file):
         print(f"❌ Error: {audio_file} not found!")
         print("Available files:")
         for f in os.listdir('.'):
-            if f.endswith(('.mp3', '.mp4', '.wav', '.webm', '.m4a', '.avi', '.mov')):
+            if Path(f).suffix.lower() in WHISPER_UPLOAD_EXTENSIONS | VIDEO_EXTENSIONS:
                 print(f"   - {f}")
     else:
-        result = transcribe_audio(audio_file)
+        result = transcribe_audio(audio_file, force=args.force)
         
         if result:
             print("\n✅ Transcription successful!")
-            
-            # Save to file
-            base_name = str(Path(audio_file).stem)
-            output_file = base_name + '_transcript.json'
-            
-            with open(output_file, 'w') as f:
-                json.dump(result, f, indent=2)
-            
-            print(f"💾 Saved transcript to: {output_file}")
         else:
             print("\n❌ Transcription failed")
@@ -0,0 +1,72 @@
+"""
+On-disk cache of Whisper transcripts, keyed by a hash of the recording's bytes
+"""
+
+import os
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+
+import env  # TRANSCRIPT_CACHE_DIR may come from .env
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(os.getenv("TRANSCRIPT_CACHE_DIR", Path.home() / ".cache" / "zoom-mom-bot"))
+
+# Read size while hashing - large recordings never have to fit in memory
+HASH_CHUNK_BYTES = 1 << 20
+
+def file_key(audio_file_path):
+    """
+    Build a cache key for a recording
+
+    Hashes the file contents, so the same recording hits the cache no matter
+    where it is stored or when it was uploaded.
+
+    Args:
+        audio_file_path: Path to audio or video file
+
+    Returns:
+        str: SHA256 hex digest
+    """
+    digest = hashlib.sha256()
+    with open(audio_file_path, 'rb') as f:
+        while chunk := f.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load(key):
+    """Return the cached transcript for `key`, or None on a miss"""
+    cache_file = CACHE_DIR / f"{key}.json"
+
+    if not cache_file.exists():
+        return None
+
+    try:
+        with open(cache_file, 'rb') as f:
+            transcript = orjson.loads(f.read()) if orjson else json.load(f)
+    except (OSError, ValueError) as e:
+        # A damaged entry just means transcribing again; store() replaces it
+        logger.warning(f"⚠️  Ignoring unreadable cached transcript {cache_file.name}: {e}")
+        return None
+
+    logger.info("⚡ Recording already transcribed - using cached transcript")
+    return transcript
+
+def store(key, transcript):
+    """Save a transcript under `key`"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Write to a unique temp file and rename, so readers never see a partial
+    # entry and concurrent jobs in one process don't share a temp name
+    fd, tmp_file = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    with os.fdopen(fd, 'wb') as f:
+        f.write(orjson.dumps(transcript) if orjson else json.dumps(transcript).encode())
+    os.replace(tmp_file, CACHE_DIR / f"{key}.json")
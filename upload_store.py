@@ -0,0 +1,28 @@
+"""
+Save files uploaded through the web UI to disk
+"""
+
+import os
+import shutil
+
+UPLOAD_DIR = "uploads"
+
+# Copy size while saving - large recordings never have to fit in memory twice
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+def save_uploaded_file(uploaded_file):
+    """
+    Save an uploaded file to UPLOAD_DIR, streaming it in 1 MiB chunks
+
+    Args:
+        uploaded_file: File-like object with a `name` (e.g. Streamlit's UploadedFile)
+
+    Returns:
+        str: Path of the saved file
+    """
+    file_path = os.path.join(UPLOAD_DIR, uploaded_file.name)
+    # Start from the beginning even if the upload was already read (e.g. previewed)
+    uploaded_file.seek(0)
+    with open(file_path, "wb") as f:
+        shutil.copyfileobj(uploaded_file, f, length=UPLOAD_CHUNK_BYTES)
+    return file_path